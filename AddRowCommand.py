@@ -1,23 +1,16 @@
-from PyQt5.QtWidgets import QUndoCommand, QTableWidgetItem
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QUndoCommand
 
 class AddRowCommand(QUndoCommand):
-    def __init__(self, table, row_position, editable_columns):
+    def __init__(self, model, row_position):
         super().__init__("Add Row")
-        self.table = table
+        self.model = model
         self.row_position = row_position
-        self.editable_columns = editable_columns
 
     def redo(self):
-        self.table.insertRow(self.row_position)
-        for col in range(self.table.columnCount()):
-            item = QTableWidgetItem("")
-            header_text = self.table.horizontalHeaderItem(col).text()
-            if header_text in self.editable_columns:
-                item.setFlags(item.flags() | Qt.ItemIsEditable)
-            else:
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-            self.table.setItem(self.row_position, col, item)
+        self.model.insert_row(self.row_position)
 
     def undo(self):
-        self.table.removeRow(self.row_position)
\ No newline at end of file
+        self.model.remove_row(self.row_position)
+
+    def remap_rows(self, mapping):
+        self.row_position = self.model.map_row(mapping, self.row_position)
\ No newline at end of file
@@ -0,0 +1,262 @@
+from gzip import GzipFile
+from json import dump, dumps
+from os import devnull, environ, pathsep
+from os.path import abspath, dirname
+from random import Random
+from re import findall, split
+from statistics import median
+from subprocess import run
+from sys import argv, executable, exit
+from time import perf_counter
+from tracemalloc import start, stop, take_snapshot, get_traced_memory, reset_peak
+from ijson import items
+from CardCatalogue import CardCatalogue
+from CardIndex import CardIndex
+from CollectionModel import CollectionModel
+from ColumnSchema import ColumnSchema
+from CustomDelegate import CustomDelegate
+from EditCellCommand import EditCellCommand
+from IngestPipeline import IngestPipeline, Throughput, CountingReader
+from MainWindow import MainWindow
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+from sharedFunctions import cached_sort_key, get_value, insert_sorted, parse_date, sort_key
+from Startup import Startup
+
+def measure(label, build):
+    start()
+    reset_peak()
+    before = take_snapshot()
+    begin = perf_counter()
+    result = build()
+    elapsed = perf_counter() - begin
+    after = take_snapshot()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    peak = get_traced_memory()[1]
+    stop()
+    print(f"{label:<16} {len(result):>9} cards {retained / 2**20:>9.1f} MiB retained {peak / 2**20:>9.1f} MiB peak {elapsed:>7.2f} s")
+    return result
+
+def build_dict(json_path):
+    with open(json_path, 'r', encoding='utf-8') as file:
+        file.readline()
+        return {(card["lang"], card["set"], card["collector_number"]): card for card in items(file, 'item')}
+
+def catalogue_memory(json_path='all_cards.json'):
+    measure("dict", lambda: build_dict(json_path))
+    measure("CardCatalogue", lambda: CardCatalogue.from_json(json_path))
+    measure("CardIndex", lambda: CardIndex.load(json_path))
+
+def open_fixture(fixture_path):
+    with open(fixture_path, 'rb') as file:
+        compressed = file.read(2) == b'\x1f\x8b'
+    return GzipFile(fixture_path) if compressed else open(fixture_path, 'rb')
+
+def single_loop_ingest(fixture_path, output):
+    throughput = Throughput()
+    with open_fixture(fixture_path) as source:
+        output.write('[\n')
+        first = True
+        for card in items(CountingReader(source, throughput), 'item'):
+            if not first:
+                output.write(',\n')
+            first = False
+            dump(Startup.create_processed_card(card), output)
+            throughput.cards += 1
+        output.write('\n]')
+    throughput.finished = perf_counter()
+    return throughput
+
+def pipelined_ingest(fixture_path, output):
+    with open_fixture(fixture_path) as source:
+        output.write('[\n')
+        separator = ''
+        def write_batch(cards):
+            nonlocal separator
+            output.write(separator + ',\n'.join(dumps(card) for card in cards))
+            separator = ',\n'
+        throughput = IngestPipeline(source, Startup.create_processed_card, write_batch).run()
+        output.write('\n]')
+    return throughput
+
+def ingest_throughput(fixture_path):
+    for label, ingest in (("single loop", single_loop_ingest), ("pipelined", pipelined_ingest)):
+        with open(devnull, 'w', encoding='utf-8', buffering=Startup.WRITE_BUFFER) as output:
+            print(f"{label:<16} {ingest(fixture_path, output)}")
+
+IMPORT_BUDGET = 0.25
+COLD_START_BUDGET = 2.0
+IMPORTTIME_LOG = "importtime.log"
+LAUNCH_SCRIPT = """
+from time import perf_counter
+launch_time = perf_counter()
+from sys import argv, exit
+from PyQt5.QtCore import QSettings, QTimer
+from PyQt5.QtWidgets import QApplication
+app = QApplication(argv)
+if QSettings("HBlaze3", "MTG-Cataloguer").value("first_startup", True, type=bool):
+    exit("Run the first startup update before benchmarking cold start")
+from MainWindow import MainWindow
+window = MainWindow(launch_time)
+window.show()
+def quit_when_ready():
+    if "catalogue_ready" in window.startup_metrics:
+        app.quit()
+    else:
+        QTimer.singleShot(10, quit_when_ready)
+quit_when_ready()
+app.exec_()
+"""
+
+class HeaderScanSchema:
+    def __init__(self, model):
+        self.model = model
+
+    def get(self, name):
+        for col in range(self.model.columnCount()):
+            if self.model.headerData(col, Qt.Horizontal) == name:
+                return col
+        return None
+
+def header_scan_duplicate(model, language, set_code, col_num):
+    for row in range(model.rowCount()):
+        if (get_value(model, row, 'Language', str) == language and
+            get_value(model, row, 'Set', str) == set_code and
+            get_value(model, row, 'Collector Number', str) == col_num):
+            return row
+    return None
+
+def edit_table(rows):
+    data = []
+    for row in range(rows):
+        card = {key: "" for key in MainWindow.column_mapping}
+        card.update(lang="en", set=f"s{row % 500}", collector_number=str(row), quantity="3", quantity_foil="1",
+                    usd="0.25", usd_foil="1.50", storage_quantity="3")
+        data.append(card)
+    return CollectionModel(data, MainWindow.column_mapping, set(MainWindow.editable_column_names.values()))
+
+def time_edits(model, schema, edits, seed=1):
+    model.schema = schema
+    delegate = CustomDelegate({})
+    random = Random(seed)
+    quantity_column = schema.get("Quantity")
+    number_column = schema.get("Collector Number")
+    edit_times, duplicate_times = [], []
+    for edit in range(edits):
+        row = random.randrange(model.rowCount())
+        begin = perf_counter()
+        EditCellCommand({}, model, row, quantity_column, "3", str(edit % 9 + 1)).redo()
+        EditCellCommand({}, model, row, number_column, str(row), str(row)).redo()
+        edit_times.append(perf_counter() - begin)
+        key = ("en", f"s{row % 500}", str(row))
+        begin = perf_counter()
+        if isinstance(schema, HeaderScanSchema):
+            header_scan_duplicate(model, *key)
+        else:
+            delegate.find_duplicate_row(model.index(row, number_column), *key)
+        duplicate_times.append(perf_counter() - begin)
+    return edit_times, duplicate_times
+
+def edit_latency(rows=20000, edits=200):
+    app = QApplication.instance() or QApplication(["Benchmark", "-platform", "offscreen"])
+    model = edit_table(int(rows))
+    for label, schema in (("header scan", HeaderScanSchema(model)), ("column schema", ColumnSchema(model))):
+        edit_times, duplicate_times = time_edits(model, schema, int(edits))
+        print(f"{label:<16} edit {median(edit_times) * 1e3:>8.3f} ms median {max(edit_times) * 1e3:>8.3f} ms max"
+              f"   duplicate check {median(duplicate_times) * 1e3:>9.3f} ms median")
+
+def uncached_sort_key(item):
+    collector_number = item['collector_number'].split(" // ")[0]
+    return (parse_date(item['release_date']), item['set'],
+            (split(r'(\d+)', collector_number)[0], int(''.join(findall(r'\d+', collector_number)))))
+
+def sort_table(records, seed=1):
+    random = Random(seed)
+    prefixes = ["", "", "", "A-", "p", "★"]
+    return [{"release_date": f"{random.randrange(1993, 2025)}-{random.randrange(1, 13):02d}-{random.randrange(1, 29):02d}",
+             "set": f"s{random.randrange(800)}",
+             "collector_number": f"{random.choice(prefixes)}{random.randrange(1, 400)}{random.choice(['', '', 'a', 'b'])}"}
+            for _ in range(records)]
+
+def sort_keys(records=50000, changed=100):
+    data = sort_table(int(records))
+    new_records = sort_table(int(changed), seed=2)
+    cached_sort_key.cache_clear()
+    timings = []
+    for label, run_sort in (("uncached sort", lambda: sorted(data, key=uncached_sort_key)),
+                            ("cached cold", lambda: sorted(data, key=sort_key)),
+                            ("cached warm", lambda: sorted(data, key=sort_key))):
+        begin = perf_counter()
+        sorted_data = run_sort()
+        timings.append((label, perf_counter() - begin))
+    begin = perf_counter()
+    sorted(sorted_data + new_records, key=sort_key)
+    timings.append((f"re-sort +{changed}", perf_counter() - begin))
+    begin = perf_counter()
+    insert_sorted(list(sorted_data), new_records)
+    timings.append((f"insert +{changed}", perf_counter() - begin))
+    for label, elapsed in timings:
+        print(f"{label:<16} {len(data):>9} records {elapsed * 1e3:>9.2f} ms")
+
+def offscreen_env():
+    env = dict(environ, QT_QPA_PLATFORM="offscreen")
+    env["PYTHONPATH"] = dirname(abspath(__file__)) + (pathsep + env["PYTHONPATH"] if "PYTHONPATH" in env else "")
+    return env
+
+def import_time(data_dir):
+    result = run([executable, "-X", "importtime", "-c", "import MainWindow"], cwd=data_dir, env=offscreen_env(),
+                 capture_output=True, text=True)
+    with open(IMPORTTIME_LOG, 'w', encoding='utf-8') as file:
+        file.write(result.stderr)
+    imports, total = [], None
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("| imported package"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            if depth == 1:
+                imports.append((int(cumulative) / 1e6, name.strip()))
+            elif depth == 0 and name.strip() == "MainWindow":
+                total = int(cumulative) / 1e6
+                break
+            elif depth == 0:
+                imports = []
+    if total is None:
+        raise RuntimeError(result.stderr.strip())
+    for elapsed, name in sorted(imports, reverse=True)[:5]:
+        print(f"  {name:<30} {elapsed:>7.3f} s")
+    return total
+
+def cold_start(data_dir):
+    begin = perf_counter()
+    result = run([executable, "-c", LAUNCH_SCRIPT], cwd=data_dir, env=offscreen_env(), capture_output=True, text=True)
+    elapsed = perf_counter() - begin
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    for line in result.stdout.splitlines():
+        if line.startswith("Startup metric"):
+            print(f"  {line}")
+    return elapsed
+
+def startup_budget(data_dir='.', import_budget=IMPORT_BUDGET, cold_start_budget=COLD_START_BUDGET):
+    over_budget = False
+    for label, measure_startup, budget in (("import MainWindow", import_time, float(import_budget)),
+                                           ("cold start", cold_start, float(cold_start_budget))):
+        elapsed = measure_startup(data_dir)
+        over_budget = over_budget or elapsed > budget
+        print(f"{label:<18} {elapsed:>7.3f} s (budget {budget:.3f} s) {'OVER BUDGET' if elapsed > budget else 'ok'}")
+    if over_budget:
+        exit(1)
+
+BENCHMARKS = {
+    "catalogue_memory": catalogue_memory,
+    "ingest_throughput": ingest_throughput,
+    "startup_budget": startup_budget,
+    "edit_latency": edit_latency,
+    "sort_keys": sort_keys,
+}
+
+if __name__ == "__main__":
+    if len(argv) < 2 or argv[1] not in BENCHMARKS:
+        print("Usage: python Benchmark.py <" + "|".join(BENCHMARKS) + "> [args...]")
+    else:
+        BENCHMARKS[argv[1]](*argv[2:])
\ No newline at end of file
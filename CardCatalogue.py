@@ -0,0 +1,56 @@
+from array import array
+from collections.abc import Mapping
+from CardIndex import CardIndex
+
+class CardCatalogue(Mapping):
+    FIELDS = CardIndex.FIELDS
+
+    def __init__(self, cards=()):
+        self.strings = [None]
+        self.codes = {None: 0}
+        self.columns = {field: array('I') for field in self.FIELDS}
+        self.rows = {}
+        for card in cards:
+            self.add(card)
+
+    @classmethod
+    def from_json(cls, json_path):
+        from ijson import items
+        with open(json_path, 'r', encoding='utf-8') as file:
+            file.readline()
+            return cls(items(file, 'item'))
+
+    def intern(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def add(self, card):
+        key = tuple(self.strings[self.intern(card.get(field))] for field in CardIndex.KEY_FIELDS)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.rows)
+            for field, column in self.columns.items():
+                column.append(self.intern(card.get(field)))
+        else:
+            for field, column in self.columns.items():
+                column[row] = self.intern(card.get(field))
+
+    def lookup(self, keys, fields):
+        columns = [self.columns[field] for field in fields]
+        return {key: tuple(self.strings[column[self.rows[key]]] for column in columns) for key in set(keys) if key in self.rows}
+
+    def __getitem__(self, key):
+        row = self.rows[key]
+        return {field: self.strings[column[row]] for field, column in self.columns.items()}
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
\ No newline at end of file
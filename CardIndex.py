@@ -0,0 +1,246 @@
+from collections.abc import Mapping
+from mmap import mmap, ACCESS_READ
+from os import replace
+from os.path import exists, splitext
+from json import load
+from struct import Struct
+
+class CardIndexWriter:
+    def __init__(self, fields):
+        self.fields = fields
+        self.pool = bytearray()
+        self.offsets = {}
+        self.records = {}
+
+    def intern(self, value):
+        if value is None:
+            return CardIndex.NONE
+        tagged = (type(value) is int, value)
+        offset = self.offsets.get(tagged)
+        if offset is None:
+            data = str(value).encode('utf-8')
+            offset = self.offsets[tagged] = len(self.pool)
+            self.pool += (len(data) | (CardIndex.INTEGER if tagged[0] else 0)).to_bytes(2, 'little') + data
+        return offset
+
+    def add(self, card):
+        key = (card['lang'], card['set'], card['collector_number'])
+        if None in key:
+            return
+        self.records[key] = tuple(self.intern(card.get(field)) for field in self.fields)
+
+    def finish(self, index_path, date):
+        record = Struct('<%dI' % len(self.fields))
+        table = bytearray(record.size * len(self.records))
+        for position, key in enumerate(sorted(self.records)):
+            record.pack_into(table, position * record.size, *self.records[key])
+        header = CardIndex.HEADER.pack(
+            CardIndex.MAGIC, len(self.records), date.encode('utf-8'), ",".join(self.fields).encode('utf-8')
+        )
+        with open(index_path + ".tmp", 'wb') as file:
+            file.write(header)
+            file.write(table)
+            file.write(self.pool)
+        replace(index_path + ".tmp", index_path)
+
+class CardIndex(Mapping):
+    MAGIC = b'MTGCIDX2'
+    HEADER = Struct('<8sI64s256s')
+    NONE = 0xFFFFFFFF
+    INTEGER = 0x8000
+    FIELDS = ("lang", "release_date", "name", "type_line", "color_identity", "set_name", "set", "collector_number", "usd", "usd_foil")
+    KEY_FIELDS = ("lang", "set", "collector_number")
+    DATE_FIELDS = ("lang", "set", "collector_number", "release_date")
+
+    def __init__(self, index_path):
+        with open(index_path, 'rb') as file:
+            self.buffer = mmap(file.fileno(), 0, access=ACCESS_READ)
+        magic, self.count, date, fields = self.HEADER.unpack_from(self.buffer, 0)
+        if magic != self.MAGIC:
+            self.buffer.close()
+            raise ValueError(f"{index_path} is not a card index")
+        self.date = date.rstrip(b'\0').decode('utf-8')
+        self.fields = tuple(fields.rstrip(b'\0').decode('utf-8').split(","))
+        self.record = Struct('<%dI' % len(self.fields))
+        self.table_offset = self.HEADER.size
+        self.pool_offset = self.table_offset + self.count * self.record.size
+        self.key_columns = [self.fields.index(field) for field in self.KEY_FIELDS]
+        self.overrides = {}
+        self.added = []
+
+    @staticmethod
+    def index_path(json_path):
+        return splitext(json_path)[0] + ".idx"
+
+    @staticmethod
+    def dates_path(json_path):
+        return splitext(json_path)[0] + ".dates.idx"
+
+    @staticmethod
+    def delta_path(json_path):
+        return splitext(json_path)[0] + ".delta.json"
+
+    @staticmethod
+    def read_delta(json_path, base_date):
+        delta_path = CardIndex.delta_path(json_path)
+        if not exists(delta_path):
+            return []
+        with open(delta_path, 'r', encoding='utf-8') as file:
+            file.readline()
+            delta = load(file)
+        if delta.get("base") != base_date:
+            return []
+        return delta["cards"]
+
+    @staticmethod
+    def read_date(json_path):
+        with open(json_path, 'r', encoding='utf-8') as file:
+            return file.readline().strip()
+
+    @classmethod
+    def open(cls, index_path, date, fields=FIELDS):
+        if not exists(index_path):
+            return None
+        try:
+            card_index = cls(index_path)
+        except (OSError, ValueError):
+            return None
+        if card_index.date != date or card_index.fields != tuple(fields):
+            card_index.close()
+            return None
+        return card_index
+
+    @classmethod
+    def build(cls, json_path, index_path=None, fields=FIELDS):
+        index_path = index_path or cls.index_path(json_path)
+        from ijson import items
+        writer = CardIndexWriter(fields)
+        with open(json_path, 'r', encoding='utf-8') as file:
+            date = file.readline().strip()
+            for card in items(file, 'item'):
+                writer.add(card)
+        writer.finish(index_path, date)
+        return cls.open(index_path, date, fields)
+
+    @classmethod
+    def load(cls, json_path, index_path=None, fields=FIELDS, apply_delta=True):
+        from ijson import IncompleteJSONError
+        index_path = index_path or cls.index_path(json_path)
+        try:
+            date = cls.read_date(json_path)
+            card_index = cls.open(index_path, date, fields)
+            if card_index is None:
+                card_index = cls.build(json_path, index_path, fields)
+            if card_index is not None and apply_delta:
+                card_index.apply_delta(cls.read_delta(json_path, date))
+            return card_index
+        except (OSError, ValueError, IncompleteJSONError, KeyError):
+            return None
+
+    def apply_delta(self, cards):
+        for card in cards:
+            key = (card['lang'], card['set'], card['collector_number'])
+            if key not in self:
+                self.added.append(key)
+            self.overrides[key] = {field: card.get(field) for field in self.fields}
+
+    def close(self):
+        self.buffer.close()
+
+    def string_at(self, offset):
+        if offset == self.NONE:
+            return None
+        start = self.pool_offset + offset
+        length = int.from_bytes(self.buffer[start:start + 2], 'little')
+        if length & self.INTEGER:
+            return int(self.buffer[start + 2:start + 2 + (length ^ self.INTEGER)])
+        return self.buffer[start + 2:start + 2 + length].decode('utf-8')
+
+    def offsets_at(self, position):
+        return self.record.unpack_from(self.buffer, self.table_offset + position * self.record.size)
+
+    def key_at(self, position):
+        offsets = self.offsets_at(position)
+        return tuple(self.string_at(offsets[column]) for column in self.key_columns)
+
+    def find(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.key_at(low) == key:
+            return low
+        return None
+
+    def lookup(self, keys, fields):
+        columns = [self.fields.index(field) for field in fields]
+        results = {}
+        position = 0
+        for key in sorted(key for key in set(keys) if isinstance(key, tuple) and all(isinstance(part, str) for part in key)):
+            if key in self.overrides:
+                results[key] = tuple(self.overrides[key].get(field) for field in fields)
+                continue
+            low = high = position
+            step = 1
+            while high < self.count and self.key_at(high) < key:
+                low = high + 1
+                high = low + step
+                step *= 2
+            high = min(high, self.count)
+            while low < high:
+                middle = (low + high) // 2
+                if self.key_at(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            position = low
+            if low < self.count and self.key_at(low) == key:
+                offsets = self.offsets_at(low)
+                results[key] = tuple(self.string_at(offsets[column]) for column in columns)
+        return results
+
+    def card_at(self, position):
+        return {field: self.string_at(offset) for field, offset in zip(self.fields, self.offsets_at(position))}
+
+    def scan(self, fields):
+        columns = [self.fields.index(field) for field in fields]
+        strings = {}
+        def string(offset):
+            if offset not in strings:
+                strings[offset] = self.string_at(offset)
+            return strings[offset]
+        for position in range(self.count):
+            offsets = self.offsets_at(position)
+            yield tuple(string(offsets[column]) for column in self.key_columns), tuple(string(offsets[column]) for column in columns)
+
+    def cards(self):
+        for position in range(self.count):
+            card = self.card_at(position)
+            key = (card['lang'], card['set'], card['collector_number'])
+            yield dict(self.overrides[key]) if key in self.overrides else card
+        for key in self.added:
+            yield dict(self.overrides[key])
+
+    def __getitem__(self, key):
+        if key in self.overrides:
+            return dict(self.overrides[key])
+        position = self.find(key) if isinstance(key, tuple) and None not in key else None
+        if position is None:
+            raise KeyError(key)
+        return self.card_at(position)
+
+    def __contains__(self, key):
+        if key in self.overrides:
+            return True
+        return isinstance(key, tuple) and None not in key and self.find(key) is not None
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.key_at(position)
+        yield from self.added
+
+    def __len__(self):
+        return self.count + len(self.added)
\ No newline at end of file
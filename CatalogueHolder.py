@@ -0,0 +1,73 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+from CatalogueLoader import CatalogueLoader
+
+class CatalogueHolder(QObject):
+    catalogue_changed = pyqtSignal(int)
+    swap_requested = pyqtSignal(object)
+    FILES = {"sets": 'sets.json', "all_cards": 'all_cards.json', "DeckList": 'DeckList.json'}
+    shared = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.version = 0
+        self.data = {"sets": [], "all_cards": None, "DeckList": [], "ADFFiles": []}
+        self.borrowed = {}
+        self.retired = []
+        self.swap_requested.connect(self.swap)
+        CatalogueHolder.shared = self
+
+    def get(self, name):
+        return self.data[name]
+
+    def swap(self, changes):
+        data = dict(self.data)
+        data.update(changes)
+        replaced = [self.data[name] for name in changes if self.data.get(name) is not data[name]]
+        self.data = data
+        self.version += 1
+        self.catalogue_changed.emit(self.version)
+        for value in replaced:
+            self.retire(value)
+
+    def borrow(self, name):
+        value = self.data[name]
+        self.borrowed[id(value)] = self.borrowed.get(id(value), 0) + 1
+        return value
+
+    def give_back(self, value):
+        count = self.borrowed.pop(id(value), 1) - 1
+        if count > 0:
+            self.borrowed[id(value)] = count
+        elif any(retired is value for retired in self.retired):
+            self.retired = [retired for retired in self.retired if retired is not value]
+            value.close()
+
+    def retire(self, value):
+        if not hasattr(value, "close"):
+            return
+        if id(value) in self.borrowed:
+            self.retired.append(value)
+        else:
+            value.close()
+
+    @staticmethod
+    def build(names):
+        from ijson import IncompleteJSONError
+        changes = {}
+        for name in names:
+            if name == "ADFFiles":
+                changes[name] = CatalogueLoader.list_deck_files()
+                continue
+            try:
+                changes[name] = CatalogueLoader.load_file(CatalogueHolder.FILES[name])
+            except (FileNotFoundError, IncompleteJSONError, KeyError, ValueError) as e:
+                print(f"Error reloading {CatalogueHolder.FILES[name]}: {e}")
+        return changes
+
+    @classmethod
+    def reload(cls, *names):
+        if cls.shared is None:
+            return
+        changes = cls.build(names)
+        if changes:
+            cls.shared.swap_requested.emit(changes)
\ No newline at end of file
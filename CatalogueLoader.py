@@ -0,0 +1,48 @@
+from json import load
+from os import listdir
+from os.path import exists, join
+from PyQt5.QtCore import QThread, pyqtSignal
+from CardCatalogue import CardCatalogue
+from CardIndex import CardIndex
+
+class CatalogueLoader(QThread):
+    catalogue_ready = pyqtSignal(object)
+    ADF_DIR = "./AllDeckFiles"
+
+    @staticmethod
+    def load_file(filename):
+        if filename == 'all_cards.json':
+            card_index = CardIndex.load(filename)
+            if card_index is not None:
+                return card_index
+        with open(filename, 'r') as file:
+            date = file.readline().strip()
+            if filename == 'all_cards.json':
+                from ijson import items
+                catalogue = CardCatalogue(items(file, 'item'))
+                for card in CardIndex.read_delta(filename, date):
+                    catalogue.add(card)
+                return catalogue
+            return load(file)
+
+    @staticmethod
+    def list_deck_files():
+        if not exists(CatalogueLoader.ADF_DIR):
+            return []
+        return [join(CatalogueLoader.ADF_DIR, file) for file in listdir(CatalogueLoader.ADF_DIR)]
+
+    @staticmethod
+    def load_catalogue():
+        from ijson import IncompleteJSONError
+        catalogue = {"errors": []}
+        for name, filename in (("sets", 'sets.json'), ("all_cards", 'all_cards.json'), ("DeckList", 'DeckList.json')):
+            try:
+                catalogue[name] = CatalogueLoader.load_file(filename)
+            except (FileNotFoundError, IncompleteJSONError, KeyError, ValueError):
+                catalogue[name] = []
+                catalogue["errors"].append(filename)
+        catalogue["ADFFiles"] = CatalogueLoader.list_deck_files()
+        return catalogue
+
+    def run(self):
+        self.catalogue_ready.emit(self.load_catalogue())
\ No newline at end of file
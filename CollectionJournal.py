@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor
+from json import load, loads, dumps
+from os import fsync, remove, replace, stat
+from os.path import exists
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class CollectionJournal(QObject):
+    compacted = pyqtSignal()
+    snapshot_changed = pyqtSignal()
+    SAVE = {"op": "save"}
+
+    def __init__(self, snapshot_path, signature, saved_offset=0, saved_entries=0, parent=None):
+        super().__init__(parent)
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + ".journal"
+        self.signature = signature
+        self.saved_offset = saved_offset
+        self.saved_entries = saved_entries
+        self.pending_entries = 0
+        self.file = None
+        self.snapshot_source = None
+        self.detached = False
+        self.compaction = None
+        self.compacted.connect(self.finish_compaction)
+
+    @staticmethod
+    def snapshot_signature(snapshot_path):
+        snapshot_stat = stat(snapshot_path)
+        return [snapshot_stat.st_size, snapshot_stat.st_mtime_ns]
+
+    @staticmethod
+    def header(signature):
+        return (dumps({"snapshot": signature}) + "\n").encode('utf-8')
+
+    @staticmethod
+    def write_snapshot(snapshot_path, data):
+        with open(snapshot_path + ".tmp", 'w') as file:
+            file.write(dumps(data))
+            file.flush()
+            fsync(file.fileno())
+        replace(snapshot_path + ".tmp", snapshot_path)
+        for journal_path in (snapshot_path + ".journal", snapshot_path + ".journal.tmp"):
+            if exists(journal_path):
+                remove(journal_path)
+
+    @staticmethod
+    def read_entries(journal_path, signature, limit=None):
+        with open(journal_path, 'rb') as file:
+            lines = (file.read(limit) if limit is not None else file.read()).split(b"\n")
+        try:
+            if loads(lines[0]).get("snapshot") != signature:
+                return None
+        except ValueError:
+            return None
+        entries, saved, offset, saved_offset = [], 0, len(lines[0]) + 1, len(lines[0]) + 1
+        for line in lines[1:]:
+            try:
+                entry = loads(line)
+            except ValueError:
+                break
+            offset += len(line) + 1
+            if entry == CollectionJournal.SAVE:
+                saved, saved_offset = len(entries), offset
+            else:
+                entries.append(entry)
+        return entries[:saved], entries[saved:], saved_offset
+
+    @staticmethod
+    def journal_entries(snapshot_path):
+        signature = CollectionJournal.snapshot_signature(snapshot_path)
+        journal_path = snapshot_path + ".journal"
+        for path in (journal_path, journal_path + ".tmp"):
+            if exists(path):
+                result = CollectionJournal.read_entries(path, signature)
+                if result is not None:
+                    if path != journal_path:
+                        replace(path, journal_path)
+                    return signature, result
+        return signature, ([], [], 0)
+
+    @staticmethod
+    def moved_order(row_count, rows, positions):
+        moved = set(rows)
+        order = [row for row in range(row_count) if row not in moved]
+        for position, row in sorted(zip(positions, rows)):
+            order.insert(position, row)
+        return order
+
+    @staticmethod
+    def apply(data, entries):
+        for entry in entries:
+            match entry["op"]:
+                case "edit":
+                    data[entry["row"]][entry["key"]] = entry["value"]
+                case "update":
+                    data[entry["row"]].update(entry["record"])
+                case "insert":
+                    data.insert(entry["row"], dict(entry["record"]))
+                case "delete":
+                    del data[entry["row"]]
+                case "move":
+                    data[:] = [data[row] for row in CollectionJournal.moved_order(len(data), entry["rows"], entry["to"])]
+        return data
+
+    @staticmethod
+    def read(snapshot_path):
+        with open(snapshot_path, 'r') as file:
+            data = load(file)
+        signature, (saved, unsaved, saved_offset) = CollectionJournal.journal_entries(snapshot_path)
+        state = {"signature": signature, "saved_offset": saved_offset, "saved_entries": len(saved), "unsaved": unsaved}
+        return CollectionJournal.apply(data, saved), state
+
+    @staticmethod
+    def compact_snapshot(snapshot_path, journal_path, signature, offset):
+        with open(snapshot_path, 'r') as file:
+            data = load(file)
+        entries = CollectionJournal.read_entries(journal_path, signature, offset)
+        if entries is None:
+            raise ValueError(f"{journal_path} does not match {snapshot_path}")
+        CollectionJournal.apply(data, entries[0])
+        with open(snapshot_path + ".compact", 'w') as file:
+            file.write(dumps(data))
+            file.flush()
+            fsync(file.fileno())
+        return snapshot_path + ".compact"
+
+    def check_snapshot(self):
+        if self.detached:
+            return True
+        if not exists(self.snapshot_path) or self.snapshot_signature(self.snapshot_path) != self.signature:
+            self.close()
+            self.detached = True
+            self.saved_entries = 0
+            self.pending_entries = 0
+            self.snapshot_changed.emit()
+            return True
+        return False
+
+    def rebase(self):
+        self.close()
+        self.write_snapshot(self.snapshot_path, self.snapshot_source())
+        self.signature = self.snapshot_signature(self.snapshot_path)
+        self.detached = False
+        self.saved_offset = 0
+        self.saved_entries = 0
+        self.pending_entries = 0
+
+    def open_file(self):
+        if self.file is None:
+            if self.saved_offset == 0 or not exists(self.path):
+                with open(self.path, 'wb') as file:
+                    file.write(self.header(self.signature))
+                self.saved_offset = len(self.header(self.signature))
+            self.file = open(self.path, 'ab')
+        return self.file
+
+    def append(self, entry):
+        if self.check_snapshot():
+            return
+        file = self.open_file()
+        file.write((dumps(entry) + "\n").encode('utf-8'))
+        file.flush()
+        self.pending_entries += 1
+
+    def save(self):
+        if self.check_snapshot():
+            self.rebase()
+            return
+        self.append(self.SAVE)
+        if self.file is not None:
+            fsync(self.file.fileno())
+            self.saved_offset = self.file.tell()
+            self.saved_entries += self.pending_entries - 1
+        self.pending_entries = 0
+        if self.saved_entries > 0:
+            self.start_compaction()
+
+    def discard_unsaved(self):
+        self.close()
+        if self.detached:
+            return
+        self.pending_entries = 0
+        if exists(self.path):
+            with open(self.path, 'r+b') as file:
+                file.truncate(self.saved_offset)
+
+    def start_compaction(self):
+        if self.compaction is not None:
+            return
+        executor = ProcessPoolExecutor(max_workers=1)
+        future = executor.submit(CollectionJournal.compact_snapshot, self.snapshot_path, self.path, self.signature, self.saved_offset)
+        self.compaction = (future, self.signature, self.saved_offset, self.saved_entries)
+        future.add_done_callback(lambda future: self.compacted.emit())
+        executor.shutdown(wait=False)
+
+    def compact(self):
+        self.finish_compaction()
+        if self.saved_entries > 0 and not self.check_snapshot():
+            self.close()
+            self.replace_snapshot(self.compact_snapshot(self.snapshot_path, self.path, self.signature, self.saved_offset),
+                                  self.saved_offset, self.saved_entries)
+
+    def finish_compaction(self):
+        if self.compaction is None:
+            return
+        (future, started_from, offset, entries), self.compaction = self.compaction, None
+        try:
+            compacted_path = future.result()
+        except (OSError, ValueError) as e:
+            print(f"Error compacting {self.snapshot_path}: {e}")
+            return
+        if started_from != self.signature or self.check_snapshot():
+            remove(compacted_path)
+            return
+        self.close()
+        self.replace_snapshot(compacted_path, offset, entries)
+        if self.saved_entries > 0:
+            self.start_compaction()
+
+    def replace_snapshot(self, compacted_path, offset, entries):
+        with open(self.path, 'rb') as file:
+            file.seek(offset)
+            tail = file.read()
+        signature = self.snapshot_signature(compacted_path)
+        header = self.header(signature)
+        with open(self.path + ".tmp", 'wb') as file:
+            file.write(header + tail)
+            file.flush()
+            fsync(file.fileno())
+        replace(compacted_path, self.snapshot_path)
+        replace(self.path + ".tmp", self.path)
+        self.signature = signature
+        self.saved_offset = len(header) + self.saved_offset - offset
+        self.saved_entries -= entries
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
\ No newline at end of file
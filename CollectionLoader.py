@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from PyQt5.QtCore import QObject, pyqtSignal
+from CollectionModel import CollectionModel
+from CollectionValuation import CollectionValuation
+
+class CollectionLoader(QObject):
+    file_loaded = pyqtSignal(str, str, object, object, object, object)
+    file_failed = pyqtSignal(str, str)
+    MAX_WORKERS = 4
+
+    def __init__(self, store, column_mapping, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.column_mapping = column_mapping
+
+    @staticmethod
+    def parse(store, file_path, column_mapping):
+        data, journal_state = store.read(file_path)
+        keys = CollectionModel.present_keys(data, column_mapping)
+        return keys, CollectionModel.build_columns(data, keys), journal_state, CollectionValuation.summarize(data)
+
+    def load(self, files):
+        executor = ProcessPoolExecutor(max_workers=max(1, min(self.MAX_WORKERS, len(files), cpu_count() or 1)))
+        for key, file_path in files:
+            future = executor.submit(CollectionLoader.parse, self.store, file_path, self.column_mapping)
+            future.add_done_callback(lambda future, key=key, file_path=file_path: self.finished(future, key, file_path))
+        executor.shutdown(wait=False)
+
+    def finished(self, future, key, file_path):
+        try:
+            keys, columns, journal_state, summary = future.result()
+            self.file_loaded.emit(key, file_path, keys, columns, journal_state, summary)
+        except Exception as e:
+            self.file_failed.emit(file_path, str(e))
\ No newline at end of file
@@ -0,0 +1,272 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from CollectionJournal import CollectionJournal
+from ColumnSchema import ColumnSchema
+
+class CollectionModel(QAbstractTableModel):
+    KEY_FIELDS = ("lang", "set", "collector_number")
+
+    def __init__(self, data, column_mapping, editable_columns, parent=None, keys=None):
+        super().__init__(parent)
+        self.column_mapping = column_mapping
+        self.editable_columns = editable_columns
+        self.keys = keys if keys is not None else self.present_keys(data, column_mapping)
+        self.headers = [column_mapping[key] for key in self.keys]
+        self.editable = [key in editable_columns for key in self.keys]
+        self.columns = self.build_columns(data, self.keys)
+        self.row_count = len(data)
+        self.dirty = [False] * self.row_count
+        self.row_ids = list(range(self.row_count))
+        self.next_row_id = self.row_count
+        self.schema = ColumnSchema(self)
+        self.key_columns = []
+        self.key_rows = None
+        self.journal = None
+        self.loading = False
+        self.valuation = None
+        self.file_path = None
+        self.update_key_columns()
+
+    @staticmethod
+    def present_keys(data, column_mapping):
+        present = set()
+        for card in data:
+            present.update(card.keys())
+        return [key for key in column_mapping if key in present]
+
+    @staticmethod
+    def build_columns(data, keys):
+        return [["" if card.get(key) is None else str(card.get(key)) for card in data] for key in keys]
+
+    @staticmethod
+    def map_row(mapping, row):
+        return mapping[row] if row < len(mapping) else row
+
+    def update_key_columns(self):
+        self.key_columns = [self.keys.index(field) for field in self.KEY_FIELDS] if set(self.KEY_FIELDS) <= set(self.keys) else []
+        self.key_rows = None
+
+    def log(self, entry):
+        if self.journal is not None:
+            self.journal.append(entry)
+
+    def valued(self, keys):
+        return self.valuation is not None and any(key in self.valuation.FIELDS for key in keys)
+
+    def value_record(self, row):
+        return {key: column[row] for key, column in zip(self.keys, self.columns) if key in self.valuation.FIELDS}
+
+    def revalue(self, before, after):
+        if self.valuation is not None:
+            self.valuation.update(self.file_path, before, after)
+
+    def apply_entries(self, entries):
+        journal, self.journal = self.journal, None
+        for entry in entries:
+            match entry["op"]:
+                case "edit":
+                    self.ensure_keys([entry["key"]])
+                    self.setData(self.index(entry["row"], self.keys.index(entry["key"])), entry["value"])
+                case "update":
+                    self.update_row(entry["row"], entry["record"])
+                case "insert":
+                    self.ensure_keys(entry["record"])
+                    self.insert_row(entry["row"], entry["record"])
+                case "delete":
+                    self.remove_row(entry["row"])
+                case "move":
+                    self.reorder(CollectionJournal.moved_order(self.row_count, entry["rows"], entry["to"]), entry["rows"])
+        self.journal = journal
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self.columns[index.column()][index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if 0 <= section < len(self.headers) else None
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.isValid() and self.editable[index.column()] and not self.loading:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        indexed = self.key_rows is not None and index.column() in self.key_columns
+        if indexed:
+            self.unindex_row(index.row())
+        valued = self.valued([self.keys[index.column()]])
+        before = [self.value_record(index.row())] if valued else []
+        self.columns[index.column()][index.row()] = "" if value is None else str(value)
+        self.dirty[index.row()] = True
+        self.log({"op": "edit", "row": index.row(), "key": self.keys[index.column()], "value": self.columns[index.column()][index.row()]})
+        if indexed:
+            self.index_row(index.row())
+        if valued:
+            self.revalue(before, [self.value_record(index.row())])
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def row_values(self, row):
+        return [column[row] for column in self.columns]
+
+    def record(self, row, keys=None):
+        if keys is None:
+            return dict(zip(self.keys, self.row_values(row)))
+        return {key: self.columns[self.keys.index(key)][row] for key in keys}
+
+    def update_row(self, row, record):
+        self.ensure_keys(record)
+        indexed = self.key_rows is not None and any(self.keys[col] in record for col in self.key_columns)
+        if indexed:
+            self.unindex_row(row)
+        valued = self.valued(record)
+        before = [self.value_record(row)] if valued else []
+        for key, value in record.items():
+            if key in self.column_mapping:
+                self.columns[self.keys.index(key)][row] = "" if value is None else str(value)
+        if indexed:
+            self.index_row(row)
+        self.log({"op": "update", "row": row, "record": {key: value for key, value in record.items() if key in self.column_mapping}})
+        if valued:
+            self.revalue(before, [self.value_record(row)])
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.keys) - 1), [Qt.DisplayRole, Qt.EditRole])
+
+    def ensure_keys(self, keys):
+        order = list(self.column_mapping)
+        for key in order:
+            if key in keys and key not in self.keys:
+                col = sum(1 for present in self.keys if order.index(present) < order.index(key))
+                self.beginInsertColumns(QModelIndex(), col, col)
+                self.keys.insert(col, key)
+                self.headers.insert(col, self.column_mapping[key])
+                self.editable.insert(col, key in self.editable_columns)
+                self.columns.insert(col, [""] * self.row_count)
+                self.update_key_columns()
+                self.endInsertColumns()
+
+    def dirty_rows(self):
+        return [row for row, dirty in enumerate(self.dirty) if dirty]
+
+    def mark_clean(self):
+        self.dirty = [False] * self.row_count
+
+    def reorder(self, order, moved_rows):
+        self.layoutAboutToBeChanged.emit()
+        mapping = [0] * self.row_count
+        for new_row, old_row in enumerate(order):
+            mapping[old_row] = new_row
+        for column in self.columns:
+            column[:] = [column[row] for row in order]
+        self.dirty = [self.dirty[row] for row in order]
+        self.row_ids = [self.row_ids[row] for row in order]
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(old_indexes, [self.index(mapping[index.row()], index.column()) for index in old_indexes])
+        self.log({"op": "move", "rows": moved_rows, "to": [mapping[row] for row in moved_rows]})
+        self.layoutChanged.emit()
+        return mapping
+
+    def insert_row(self, row, record=None):
+        record = record or {}
+        self.beginInsertRows(QModelIndex(), row, row)
+        for key, column in zip(self.keys, self.columns):
+            column.insert(row, record.get(key, ""))
+        self.dirty.insert(row, True)
+        self.row_ids.insert(row, self.next_row_id)
+        self.next_row_id += 1
+        self.row_count += 1
+        self.log({"op": "insert", "row": row, "record": self.record(row)})
+        self.index_row(row)
+        self.endInsertRows()
+        if self.valuation is not None:
+            self.revalue([], [self.value_record(row)])
+
+    def remove_row(self, row):
+        record = self.record(row)
+        before = [self.value_record(row)] if self.valuation is not None else []
+        self.unindex_row(row)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        for column in self.columns:
+            del column[row]
+        del self.dirty[row]
+        del self.row_ids[row]
+        self.row_count -= 1
+        self.log({"op": "delete", "row": row})
+        self.endRemoveRows()
+        self.revalue(before, [])
+        return record
+
+    def append_rows(self, columns, start, end):
+        if end <= start:
+            return
+        first = self.row_count
+        self.beginInsertRows(QModelIndex(), first, first + end - start - 1)
+        for column, values in zip(self.columns, columns):
+            column.extend(values[start:end])
+        self.dirty.extend([False] * (end - start))
+        self.row_ids.extend(range(self.next_row_id, self.next_row_id + end - start))
+        self.next_row_id += end - start
+        self.row_count += end - start
+        if self.key_rows is not None:
+            for row in range(first, self.row_count):
+                self.index_row(row)
+        self.endInsertRows()
+
+    def row_key(self, row):
+        return tuple(self.columns[col][row] for col in self.key_columns)
+
+    def index_row(self, row):
+        if self.key_rows is not None and self.key_columns:
+            self.key_rows.setdefault(self.row_key(row), []).append(self.row_ids[row])
+
+    def unindex_row(self, row):
+        if self.key_rows is not None and self.key_columns:
+            key = self.row_key(row)
+            row_ids = self.key_rows[key]
+            row_ids.remove(self.row_ids[row])
+            if not row_ids:
+                del self.key_rows[key]
+
+    def build_key_index(self):
+        self.key_rows = {}
+        for row_id, key in zip(self.row_ids, zip(*(self.columns[col] for col in self.key_columns))):
+            self.key_rows.setdefault(key, []).append(row_id)
+
+    def row_position(self, row_id):
+        if row_id < self.row_count and self.row_ids[row_id] == row_id:
+            return row_id
+        return self.row_ids.index(row_id)
+
+    def rows_for_key(self, key):
+        if not self.key_columns:
+            return []
+        if self.key_rows is None:
+            self.build_key_index()
+        return [self.row_position(row_id) for row_id in self.key_rows.get(key, [])]
+
+    def duplicates(self):
+        if not self.key_columns:
+            return {}
+        if self.key_rows is None:
+            self.build_key_index()
+        return {key: sorted(self.row_position(row_id) for row_id in row_ids)
+                for key, row_ids in self.key_rows.items() if len(row_ids) > 1 and all(key)}
+
+    def records(self):
+        return [dict(zip(self.keys, values)) for values in zip(*self.columns)] if self.columns else [{} for _ in range(self.row_count)]
+
+    def sample_rows(self, sample_size):
+        step = max(1, self.row_count // sample_size)
+        return range(0, self.row_count, step)
\ No newline at end of file
@@ -0,0 +1,32 @@
+from json import dump
+from os.path import exists
+from CollectionJournal import CollectionJournal
+
+class CollectionStore:
+    DATABASE = "./JSONs/collection.db"
+
+    @staticmethod
+    def from_settings(settings):
+        if settings.value("storage/backend", "json") == "sqlite":
+            from SqliteStore import SqliteStore
+            return SqliteStore(settings.value("storage/database", CollectionStore.DATABASE))
+        return CollectionStore()
+
+    def exists(self, file_path):
+        return exists(file_path)
+
+    def create(self, file_path):
+        with open(file_path, 'w') as file:
+            dump([], file)
+
+    def signature(self, file_path):
+        return [CollectionJournal.snapshot_signature(path) if exists(path) else None for path in (file_path, file_path + ".journal")]
+
+    def read(self, file_path):
+        return CollectionJournal.read(file_path)
+
+    def write(self, file_path, data):
+        CollectionJournal.write_snapshot(file_path, data)
+
+    def open_journal(self, file_path, state, parent=None):
+        return CollectionJournal(file_path, state["signature"], state["saved_offset"], state["saved_entries"], parent)
\ No newline at end of file
@@ -0,0 +1,198 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from json import load, dumps
+from os import makedirs, replace
+from os.path import abspath, basename, dirname, exists, normcase
+from PyQt5.QtCore import QObject, pyqtSignal
+from CollectionStore import CollectionStore
+from sharedFunctions import parse_cents, parse_quantity
+
+class CollectionValuation(QObject):
+    changed = pyqtSignal()
+    verifying = pyqtSignal(bool)
+    CACHE = "./JSONs/valuation.json"
+    MAX_WORKERS = 4
+    FIELDS = ("set", "color_identity", "storage_areas", "quantity", "quantity_foil", "usd", "usd_foil")
+    GROUPS = {"sets": "set", "colors": "color_identity", "storage": "storage_areas"}
+    shared = None
+
+    def __init__(self, settings, parent=None, cache=CACHE):
+        super().__init__(parent)
+        self.settings = settings
+        self.cache = cache
+        self.files = {}
+        self.stale = set()
+        self.generations = {}
+        self.worker = None
+        self.queued = None
+        self.open_files = list
+        CollectionValuation.shared = self
+
+    @staticmethod
+    def file_key(file_path):
+        return normcase(abspath(file_path))
+
+    @staticmethod
+    def empty():
+        return {"total": [0, 0, 0], "sets": {}, "colors": {}, "storage": {}}
+
+    @staticmethod
+    def amounts(record):
+        if not record.get('set'):
+            return None
+        quantity = parse_quantity(record.get('quantity', '1'), 1, 1)
+        quantity_foil = parse_quantity(record.get('quantity_foil', '0'), 0, 0)
+        return [(quantity - quantity_foil) * (parse_cents(record.get('usd')) or 0),
+                quantity_foil * (parse_cents(record.get('usd_foil')) or 0), quantity]
+
+    @staticmethod
+    def add_amounts(bucket, amounts, sign=1):
+        for index, amount in enumerate(amounts):
+            bucket[index] += sign * amount
+
+    @staticmethod
+    def add_records(summary, records, sign=1):
+        for record in records:
+            amounts = CollectionValuation.amounts(record)
+            if amounts is None:
+                continue
+            CollectionValuation.add_amounts(summary["total"], amounts, sign)
+            for group, field in CollectionValuation.GROUPS.items():
+                name = str(record.get(field) or "")
+                bucket = summary[group].setdefault(name, [0, 0, 0])
+                CollectionValuation.add_amounts(bucket, amounts, sign)
+                if not any(bucket):
+                    del summary[group][name]
+        return summary
+
+    @staticmethod
+    def summarize(records):
+        return CollectionValuation.add_records(CollectionValuation.empty(), records)
+
+    @staticmethod
+    def scan_file(store, file_path, signature):
+        if not store.exists(file_path):
+            return None, None
+        if signature is not None and store.signature(file_path) == signature:
+            return signature, None
+        summary = CollectionValuation.summarize(store.read(file_path)[0])
+        return store.signature(file_path), summary
+
+    @staticmethod
+    def scan(store, signatures):
+        results = {}
+        with ProcessPoolExecutor(max_workers=max(1, min(CollectionValuation.MAX_WORKERS, len(signatures)))) as executor:
+            futures = {executor.submit(CollectionValuation.scan_file, store, file_path, signature): file_path
+                       for file_path, signature in signatures.items()}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"Error valuing {futures[future]}: {e}")
+        return results
+
+    def collection_files(self):
+        return [(key.split("/")[1], self.settings.value(key)) for key in self.settings.allKeys()
+                if key.startswith("paths/") and self.settings.value(key)]
+
+    def touch(self, key):
+        self.stale.add(key)
+        self.generations[key] = self.generations.get(key, 0) + 1
+
+    def replace(self, file_path, summary):
+        key = self.file_key(file_path)
+        self.files[key] = {"signature": None, "summary": summary}
+        self.touch(key)
+        self.changed.emit()
+
+    def update(self, file_path, before, after):
+        key = self.file_key(file_path)
+        if key not in self.files:
+            return
+        summary = self.files[key]["summary"]
+        self.add_records(summary, before, -1)
+        self.add_records(summary, after)
+        self.touch(key)
+        self.changed.emit()
+
+    def summary(self):
+        labels = {self.file_key(file_path): label for label, file_path in self.collection_files()}
+        combined = self.empty()
+        combined["files"] = {}
+        for key, entry in self.files.items():
+            summary = entry["summary"]
+            combined["files"][labels.get(key, basename(key))] = list(summary["total"])
+            self.add_amounts(combined["total"], summary["total"])
+            for group in self.GROUPS:
+                for name, amounts in summary[group].items():
+                    self.add_amounts(combined[group].setdefault(name, [0, 0, 0]), amounts)
+        return combined
+
+    def load(self):
+        if not exists(self.cache):
+            return
+        try:
+            with open(self.cache, 'r') as file:
+                self.files = load(file)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {self.cache}: {e}")
+            self.files = {}
+        self.changed.emit()
+
+    def save(self):
+        if self.stale:
+            store = CollectionStore.from_settings(self.settings)
+            for key in self.stale:
+                if key in self.files:
+                    try:
+                        self.files[key]["signature"] = store.signature(key) if store.exists(key) else None
+                    except (OSError, ValueError) as e:
+                        print(f"Error reading signature of {key}: {e}")
+            self.stale = set()
+        try:
+            if dirname(self.cache):
+                makedirs(dirname(self.cache), exist_ok=True)
+            with open(self.cache + ".tmp", 'w') as file:
+                file.write(dumps(self.files))
+            replace(self.cache + ".tmp", self.cache)
+        except OSError as e:
+            print(f"Error writing {self.cache}: {e}")
+
+    def verify(self, force=False):
+        if self.worker is not None:
+            self.queued = force or bool(self.queued)
+            return
+        from Startup import WorkerThread
+        files = {self.file_key(file_path): file_path for _, file_path in self.collection_files()}
+        for key in set(self.files) - set(files):
+            del self.files[key]
+        skipped = {self.file_key(file_path) for file_path in self.open_files()} | (set() if force else self.stale)
+        signatures = {file_path: None if force else self.files.get(key, {}).get("signature")
+                      for key, file_path in files.items() if key not in skipped}
+        generations = {key: self.generations.get(key, 0) for key in files}
+        store = CollectionStore.from_settings(self.settings)
+        self.worker = WorkerThread(target=CollectionValuation.scan, args=(store, signatures), parent=self)
+        self.worker.finished.connect(lambda: self.finish_verify(generations))
+        self.verifying.emit(True)
+        self.worker.start()
+
+    def finish_verify(self, generations):
+        worker, self.worker = self.worker, None
+        if worker.error is not None:
+            print(f"Error valuing collection: {worker.error}")
+        for file_path, (signature, summary) in (worker.result or {}).items():
+            key = self.file_key(file_path)
+            if self.generations.get(key, 0) != generations.get(key, 0):
+                continue
+            if signature is None:
+                self.files.pop(key, None)
+            elif summary is None:
+                self.files[key]["signature"] = signature
+            else:
+                self.files[key] = {"signature": signature, "summary": summary}
+            self.stale.discard(key)
+        self.save()
+        self.verifying.emit(False)
+        self.changed.emit()
+        if self.queued is not None:
+            force, self.queued = self.queued, None
+            self.verify(force)
\ No newline at end of file
@@ -0,0 +1,23 @@
+from PyQt5.QtCore import Qt
+
+class ColumnSchema:
+    def __init__(self, model):
+        self.model = model
+        self.indexes = {}
+        self.refresh()
+        model.headerDataChanged.connect(self.refresh)
+        model.columnsInserted.connect(self.refresh)
+        model.columnsRemoved.connect(self.refresh)
+        model.columnsMoved.connect(self.refresh)
+        model.modelReset.connect(self.refresh)
+
+    def refresh(self, *args):
+        self.indexes = {}
+        for col in range(self.model.columnCount()):
+            self.indexes.setdefault(self.model.headerData(col, Qt.Horizontal), col)
+
+    def get(self, name):
+        return self.indexes.get(name)
+
+    def __contains__(self, name):
+        return name in self.indexes
\ No newline at end of file
@@ -13,6 +13,10 @@ class CustomDelegate(QItemDelegate):
         self.sets = sets or []
         self.langs = langs or []
 
+    def set_catalogue(self, all_cards, sets):
+        self.all_cards = all_cards
+        self.sets = sets or []
+
     def createCompleter(self, header, header_list, editor, index):
         header_text = index.model().headerData(index.column(), Qt.Horizontal)
         if header_text in self.editable_columns and header_text.lower() == header:
@@ -56,13 +60,13 @@ class CustomDelegate(QItemDelegate):
 
                     if self.check_duplicate(index, language, set_code, col_num):
                         return
-                command = EditCellCommand(self.all_cards, self.parent(), index.row(), index.column(), old_value, new_value)
+                command = EditCellCommand(self.all_cards, model, index.row(), index.column(), old_value, new_value)
                 self.undo_stack.push(command)
             model.setData(index, new_value, Qt.EditRole)
             
     def check_duplicate(self, index, language, set_code, col_num):
         existing_row = self.find_duplicate_row(index, language, set_code, col_num)
-        if existing_row is not None and existing_row is not index.row():
+        if existing_row is not None and existing_row != index.row():
             reply = QMessageBox.question(self.parent(), 'Duplicate Entry',
                                          "A similar entry exists at row "+str((existing_row+1))+". Do you want to edit the existing entry?",
                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
@@ -72,10 +76,7 @@ class CustomDelegate(QItemDelegate):
         return False
     
     def find_duplicate_row(self, index, language, set_code, col_num):
-        model = index.model()
-        for row in range(model.rowCount()):
-            if (self.get_value(model, row, 'Language', str) == language and
-                self.get_value(model, row, 'Set', str) == set_code and
-                self.get_value(model, row, 'Collector Number', str) == col_num):
+        for row in index.model().rows_for_key((language, set_code, col_num)):
+            if row != index.row():
                 return row
         return None
\ No newline at end of file
@@ -0,0 +1,199 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from json import load, dump
+from os import cpu_count, makedirs, replace
+from os.path import basename, exists, join, splitext
+from zipfile import ZipFile
+from ijson import items
+from CardIndex import CardIndex
+
+class DeckRewriter:
+    POOL_THRESHOLD = 32
+    zip_file = None
+    all_cards_data = None
+
+    @staticmethod
+    def manifest_path(zip_path):
+        return splitext(zip_path)[0] + ".manifest"
+
+    @staticmethod
+    def read_manifest(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                return load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def write_manifest(manifest_path, manifest):
+        with open(manifest_path + ".tmp", 'w', encoding='utf-8') as file:
+            dump(manifest, file)
+        replace(manifest_path + ".tmp", manifest_path)
+
+    @staticmethod
+    def signature(member):
+        return f"{member.CRC:08x}-{member.file_size}"
+
+    @staticmethod
+    def catalogue_date(json_path):
+        delta_path = CardIndex.delta_path(json_path)
+        return CardIndex.read_date(delta_path if exists(delta_path) else json_path)
+
+    @staticmethod
+    def load_release_dates(json_path):
+        all_cards_data = CardIndex.load(json_path, CardIndex.dates_path(json_path), CardIndex.DATE_FIELDS)
+        if all_cards_data is None:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                f.readline()
+                all_cards_data = {
+                    (card['lang'], card['set'], card['collector_number']): {"release_date": card["release_date"]}
+                    for card in items(f, 'item')
+                }
+        return all_cards_data
+
+    @staticmethod
+    def init_worker(zip_path, json_path):
+        DeckRewriter.zip_file = ZipFile(zip_path, 'r')
+        DeckRewriter.all_cards_data = DeckRewriter.load_release_dates(json_path)
+
+    @staticmethod
+    def rewrite_member(member_name, output_path):
+        with DeckRewriter.zip_file.open(member_name) as member_file:
+            data = next(items(member_file, 'data'))
+        deck = DeckRewriter.convert_deck(data, DeckRewriter.all_cards_data)
+        with open(output_path, 'w', encoding='utf-8') as file:
+            dump(deck, file)
+        return member_name, all(card.get('release_date') for card in deck)
+
+    @staticmethod
+    def rewrite_decks(zip_path, json_path, precon_path, progress, override=False):
+        makedirs(precon_path, exist_ok=True)
+        manifest_path = DeckRewriter.manifest_path(zip_path)
+        manifest = {} if override else DeckRewriter.read_manifest(manifest_path)
+        date = DeckRewriter.catalogue_date(json_path)
+        with ZipFile(zip_path, 'r') as zip_ref:
+            members = [member for member in zip_ref.infolist() if not member.is_dir()]
+        signatures = {member.filename: DeckRewriter.signature(member) for member in members}
+        current = {name: (signature, f"{signature}@{date}") for name, signature in signatures.items()}
+        pending = [
+            member.filename for member in members
+            if manifest.get(member.filename) not in current[member.filename]
+            or not exists(join(precon_path, basename(member.filename)))
+        ]
+        manifest = {name: manifest[name] for name in signatures if manifest.get(name) in current[name]}
+
+        done = 0
+        progress.start(zip_path, "rewrite")
+        def record(result):
+            nonlocal done
+            member_name, resolved = result
+            done += 1
+            manifest[member_name] = current[member_name][0 if resolved else 1]
+            progress.update(zip_path, "rewrite", done, len(pending), "decks")
+
+        all_cards_data = DeckRewriter.load_release_dates(json_path)
+        if len(pending) < DeckRewriter.POOL_THRESHOLD or not isinstance(all_cards_data, CardIndex):
+            DeckRewriter.zip_file = ZipFile(zip_path, 'r')
+            DeckRewriter.all_cards_data = all_cards_data
+            try:
+                for member_name in pending:
+                    try:
+                        record(DeckRewriter.rewrite_member(member_name, join(precon_path, basename(member_name))))
+                    except Exception as e:
+                        print(f"Error rewriting {member_name}: {e}")
+            finally:
+                DeckRewriter.zip_file.close()
+                DeckRewriter.zip_file = None
+                DeckRewriter.all_cards_data = None
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(cpu_count() or 1, len(pending)),
+                initializer=DeckRewriter.init_worker,
+                initargs=(zip_path, json_path)
+            ) as pool:
+                futures = {
+                    pool.submit(DeckRewriter.rewrite_member, member_name, join(precon_path, basename(member_name))): member_name
+                    for member_name in pending
+                }
+                for future in as_completed(futures):
+                    try:
+                        record(future.result())
+                    except Exception as e:
+                        print(f"Error rewriting {futures[future]}: {e}")
+        DeckRewriter.write_manifest(manifest_path, manifest)
+        progress.finish(zip_path, "rewrite", done, len(pending), "decks")
+        return len(pending)
+
+    @staticmethod
+    def convert_deck(data, all_cards_data):
+        deck = []
+        if data['commander']:
+            commander = data['commander'][0]
+            deck.append(DeckRewriter.create_card_data_dict(commander, all_cards_data))
+        for card in data['mainBoard']:
+            deck.append(DeckRewriter.create_card_data_dict(card, all_cards_data))
+        return deck
+
+    @staticmethod
+    def get_language_code(lang):
+        match lang:
+            case "Spanish":
+                return "es"
+            case "French":
+                return "fr"
+            case "German":
+                return "de"
+            case "Italian":
+                return "it"
+            case "Portuguese (Brazil)":
+                return "pt"
+            case "Japanese":
+                return "ja"
+            case "Korean":
+                return "ko"
+            case "Russian":
+                return "ru"
+            case "Chinese Simplified":
+                return "zhs"
+            case "Chinese Traditional":
+                return "zht"
+            case "Phyrexian":
+                return "ph"
+        return "en"
+
+    @staticmethod
+    def create_card_data_dict(card_info, all_cards_data):
+        try:
+            quantity = str(card_info['count'])
+            quantity_foil = quantity if card_info.get('isFoil') else ""
+            lang = DeckRewriter.get_language_code(card_info['language'])
+            setCode = str(card_info['setCode']).lower()
+            card_key = (lang, setCode, card_info['number'])
+            release_date = all_cards_data.get(card_key, {}).get('release_date')
+            return {
+                "lang": lang,
+                "release_date": release_date,
+                "name": card_info['name'],
+                "type_line": card_info['type'],
+                "color_identity": ','.join(card_info['colorIdentity']),
+                "set_name": "",
+                "set": setCode,
+                "collector_number": card_info['number'],
+                "quantity": quantity,
+                "quantity_foil": quantity_foil,
+                "usd": "",
+                "usd_foil": "",
+                "total_usd": "",
+                "total_usd_foil": "",
+                "storage_areas": "N/A",
+                "storage_quantity": quantity,
+                "deck_type": "",
+                "deck_quantity": "",
+                "deck_type_two": "",
+                "deck_quantity_two": "",
+                "deck_type_three": "",
+                "deck_quantity_three": "",
+                "deck_type_four": "",
+                "deck_quantity_four": ""
+            }
+        except Exception as e:
+            return {}
\ No newline at end of file
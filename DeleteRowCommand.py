@@ -1,21 +1,17 @@
-from PyQt5.QtWidgets import QUndoCommand, QTableWidgetItem
+from PyQt5.QtWidgets import QUndoCommand
 
 class DeleteRowCommand(QUndoCommand):
-    def __init__(self, table, row_position):
+    def __init__(self, model, row_position):
         super().__init__("Delete Row")
-        self.table = table
+        self.model = model
         self.row_position = row_position
-        self.row_data = self._get_row_data()
-
-    def _get_row_data(self):
-        return [self.table.item(self.row_position, col).text() if self.table.item(self.row_position, col) else '' 
-                for col in range(self.table.columnCount())]
+        self.row_data = self.model.record(row_position)
 
     def redo(self):
-        self.table.removeRow(self.row_position)
+        self.model.remove_row(self.row_position)
 
     def undo(self):
-        self.table.insertRow(self.row_position)
-        for col, value in enumerate(self.row_data):
-            item = QTableWidgetItem(value)
-            self.table.setItem(self.row_position, col, item)
\ No newline at end of file
+        self.model.insert_row(self.row_position, self.row_data)
+
+    def remap_rows(self, mapping):
+        self.row_position = self.model.map_row(mapping, self.row_position)
\ No newline at end of file
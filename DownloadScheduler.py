@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from random import uniform
+from threading import BoundedSemaphore, Lock
+from time import perf_counter, sleep
+from requests import Session, ConnectionError, Timeout
+from requests.adapters import HTTPAdapter
+
+class DownloadScheduler:
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_concurrency=3, retries=3, backoff=1.0, timeout=60, progress=None):
+        self.max_concurrency = max_concurrency
+        self.progress = progress
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.slots = BoundedSemaphore(max_concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.timings = {}
+        self.timings_lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def retry_delay(self, attempt):
+        return self.backoff * 2 ** attempt * uniform(0.5, 1.5)
+
+    @contextmanager
+    def request(self, url, headers=None, stream=False):
+        with self.slots:
+            for attempt in range(self.retries + 1):
+                try:
+                    response = self.session.get(url, headers=headers, stream=stream, timeout=self.timeout)
+                except (ConnectionError, Timeout):
+                    if attempt == self.retries:
+                        raise
+                else:
+                    if response.status_code not in self.RETRY_STATUSES or attempt == self.retries:
+                        break
+                    response.close()
+                sleep(self.retry_delay(attempt))
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def submit(self, name, target, *args):
+        def timed():
+            started = perf_counter()
+            try:
+                return target(*args)
+            finally:
+                with self.timings_lock:
+                    self.timings[name] = perf_counter() - started
+        future = self.executor.submit(timed)
+        future.task_name = name
+        return future
+
+    def wait(self, futures):
+        results = {}
+        for future in as_completed(futures):
+            try:
+                results[future.task_name] = future.result()
+            except Exception as e:
+                print(f"Error in {future.task_name}: {e}")
+        for name, elapsed in sorted(self.timings.items()):
+            print(f"{name}: {elapsed:.2f} s")
+        return results
\ No newline at end of file
@@ -1,16 +1,17 @@
-from PyQt5.QtWidgets import QTableWidgetItem, QUndoCommand, QMessageBox
+from PyQt5.QtWidgets import QUndoCommand
 from PyQt5.QtCore import Qt
 from itertools import zip_longest
 from typing import OrderedDict
-from sharedFunctions import get_value
+from sharedFunctions import get_value, parse_cents, catalogue_cents, format_cents
 
 class EditCellCommand(QUndoCommand):
-    def __init__(self, all_cards, table, row, column, old_value, new_value):
+    def __init__(self, all_cards, model, row, column, old_value, new_value):
         super().__init__("Edit Cell")
         self.get_value = get_value
-        self.table = table
+        self.model = model
         self.row = row
         self.column = column
+        self.header = model.headerData(column, Qt.Horizontal)
         self.old_value = old_value
         self.new_value = new_value
         self.all_cards = all_cards
@@ -22,18 +23,13 @@ class EditCellCommand(QUndoCommand):
         self.perform_edit(self.new_value)
 
     def perform_edit(self, value):
-        item = self.table.item(self.row, self.column)
-        if item is None:
-            item = QTableWidgetItem(value)
-            self.table.setItem(self.row, self.column, item)
-        else:
-            item.setText(value)
-        self.table.model().setData(self.table.model().index(self.row, self.column), value, Qt.EditRole)
+        self.column = self.model.schema.get(self.header)
+        self.model.setData(self.model.index(self.row, self.column), value, Qt.EditRole)
         self.update_related_data()
 
     def update_related_data(self):
-        header_text = self.table.model().headerData(self.column, Qt.Horizontal)
-        model = self.table.model()
+        header_text = self.model.headerData(self.column, Qt.Horizontal)
+        model = self.model
         
         quantity_columns = ["Quantity", "Deck Quantity", "Deck Quantity 2", "Deck Quantity 3", "Deck Quantity 4"]
         price_columns = ["Quantity", "Quantity Foil", "USD", "USD Foil"]
@@ -70,33 +66,26 @@ class EditCellCommand(QUndoCommand):
                     self.update_cell(model, row, 'Type', card['type_line'])
                     self.update_cell(model, row, 'Color Identity', card['color_identity'])
                     self.update_cell(model, row, 'Set Name', card['set_name'])
-                    self.update_cell(model, row, 'USD', card['usd'])
-                    self.update_cell(model, row, 'USD Foil', card['usd_foil'])
+                    self.update_cell(model, row, 'USD', format_cents(catalogue_cents(card['usd'])))
+                    self.update_cell(model, row, 'USD Foil', format_cents(catalogue_cents(card['usd_foil'])))
 
     def update_cell(self, model, row, column_name, value):
-        for col in range(model.columnCount()):
-            if model.headerData(col, Qt.Horizontal) == column_name:
-                model.setData(model.index(row, col), value, Qt.EditRole)
-                break
+        col = model.schema.get(column_name)
+        if col is not None:
+            model.setData(model.index(row, col), value, Qt.EditRole)
 
     def update_price(self, model, row, price_columns):
         total_values = []
         for price_column in price_columns[:2]:
             total_values.append(self.get_value(model, row, price_column))
         for price_column in price_columns[2:]:
-            total_values.append(self.get_value(model, row, price_column, float))
+            total_values.append(parse_cents(self.get_value(model, row, price_column, str)) or 0)
 
         total_usd = (total_values[0] - total_values[1]) * total_values[2]
         total_usd_foil = total_values[1] * total_values[3]
 
-        for col in range(model.columnCount()):
-            header = model.headerData(col, Qt.Horizontal)
-            if header == "Total USD":
-                total_usd_index = model.index(row, col)
-                model.setData(total_usd_index, "" if total_usd == 0 else f"{total_usd:.2f}", Qt.EditRole)
-            elif header == "Total USD Foil":
-                total_usd_foil_index = model.index(row, col)
-                model.setData(total_usd_foil_index, "" if total_usd_foil == 0 else f"{total_usd_foil:.2f}", Qt.EditRole)
+        self.update_cell(model, row, "Total USD", "" if total_usd == 0 else format_cents(total_usd))
+        self.update_cell(model, row, "Total USD Foil", "" if total_usd_foil == 0 else format_cents(total_usd_foil))
 
     def update_quantity(self, model, row, quantity_columns):
         quantity_values = []
@@ -105,9 +94,7 @@ class EditCellCommand(QUndoCommand):
         
         storage_quantity = quantity_values[0] - (sum(quantity_values[1:]))
 
-        for col in range(model.columnCount()):
-            if model.headerData(col, Qt.Horizontal) == "Storage Quantity":
-                storage_index = model.index(row, col)
-                model.setData(storage_index, str(storage_quantity), Qt.EditRole)
-                break
-    
+        self.update_cell(model, row, "Storage Quantity", str(storage_quantity))
+
+    def remap_rows(self, mapping):
+        self.row = self.model.map_row(mapping, self.row)
\ No newline at end of file
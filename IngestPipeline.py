@@ -0,0 +1,110 @@
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+import ijson
+
+def get_ijson_backend():
+    for name in ('yajl2_c', 'yajl2_cffi', 'yajl2'):
+        try:
+            return ijson.get_backend(name)
+        except ImportError:
+            continue
+    return ijson
+
+class CountingReader:
+    def __init__(self, source, throughput):
+        self.source = source
+        self.throughput = throughput
+
+    def read(self, size=-1):
+        data = self.source.read(size)
+        self.throughput.bytes += len(data)
+        return data
+
+class Throughput:
+    def __init__(self):
+        self.cards = 0
+        self.bytes = 0
+        self.started = perf_counter()
+        self.finished = None
+
+    def elapsed(self):
+        return (self.finished or perf_counter()) - self.started
+
+    def cards_per_second(self):
+        return self.cards / max(self.elapsed(), 1e-9)
+
+    def mb_per_second(self):
+        return self.bytes / 2**20 / max(self.elapsed(), 1e-9)
+
+    def __str__(self):
+        return (f"{self.cards} cards, {self.bytes / 2**20:.1f} MB in {self.elapsed():.2f} s "
+                f"({self.cards_per_second():.0f} cards/sec, {self.mb_per_second():.1f} MB/sec)")
+
+class IngestPipeline:
+    BATCH_SIZE = 2000
+    QUEUE_SIZE = 8
+    DONE = object()
+
+    def __init__(self, source, project, sink, prefix='item', on_batch=None):
+        self.source = source
+        self.project = project
+        self.sink = sink
+        self.on_batch = on_batch
+        self.prefix = prefix
+        self.backend = get_ijson_backend()
+        self.throughput = Throughput()
+        self.parsed = Queue(self.QUEUE_SIZE)
+        self.projected = Queue(self.QUEUE_SIZE)
+        self.error = None
+
+    def parse_stage(self):
+        try:
+            batch = []
+            for card in self.backend.items(CountingReader(self.source, self.throughput), self.prefix):
+                batch.append(card)
+                if len(batch) >= self.BATCH_SIZE:
+                    self.parsed.put(batch)
+                    batch = []
+                    if self.error is not None:
+                        break
+            if batch and self.error is None:
+                self.parsed.put(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.parsed.put(self.DONE)
+
+    def project_stage(self):
+        try:
+            while (batch := self.parsed.get()) is not self.DONE:
+                if self.error is None:
+                    self.projected.put([self.project(card) for card in batch])
+        except Exception as e:
+            self.error = e
+            while self.parsed.get() is not self.DONE:
+                pass
+        finally:
+            self.projected.put(self.DONE)
+
+    def run(self):
+        stages = [Thread(target=self.parse_stage, daemon=True), Thread(target=self.project_stage, daemon=True)]
+        for stage in stages:
+            stage.start()
+        try:
+            while (batch := self.projected.get()) is not self.DONE:
+                if self.error is None:
+                    self.sink(batch)
+                    self.throughput.cards += len(batch)
+                    if self.on_batch is not None:
+                        self.on_batch(self.throughput)
+        except Exception as e:
+            self.error = e
+            while self.projected.get() is not self.DONE:
+                pass
+        for stage in stages:
+            stage.join()
+        self.throughput.finished = perf_counter()
+        if self.error is not None:
+            raise self.error
+        return self.throughput
\ No newline at end of file
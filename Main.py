@@ -1,9 +1,11 @@
+from time import perf_counter
+launch_time = perf_counter()
 from sys import argv, exit
 from PyQt5.QtWidgets import QApplication
 from MainWindow import MainWindow
 
 if __name__ == "__main__":
     app = QApplication(argv)
-    window = MainWindow()
+    window = MainWindow(launch_time)
     window.show()
     exit(app.exec_())
\ No newline at end of file
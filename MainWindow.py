@@ -1,88 +1,107 @@
 from csv import writer
-from json import dump, load
+from bisect import bisect_right
+from itertools import islice
+from operator import le
 from AddRowCommand import AddRowCommand
+from CatalogueHolder import CatalogueHolder
+from CatalogueLoader import CatalogueLoader
+from CollectionLoader import CollectionLoader
+from CollectionModel import CollectionModel
+from CollectionStore import CollectionStore
+from CollectionValuation import CollectionValuation
 from CustomDelegate import CustomDelegate
 from DeleteRowCommand import DeleteRowCommand
+from EditCellCommand import EditCellCommand
 from PathSelectionDialog import PathSelectionDialog
 from PreconsTab import PreconsTab
 from SettingsDialog import SettingsDialog
 from TabWidget import TabWidget
-from PyQt5.QtWidgets import (QMainWindow, QFileDialog, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget, QPushButton, 
-                             QMenuBar, QAction, QLabel, QHBoxLayout, QAbstractItemView, QMessageBox, QUndoStack, QInputDialog)
-from PyQt5.QtCore import QSettings, Qt
+from ValuationPanel import ValuationPanel
+from PyQt5.QtWidgets import (QMainWindow, QFileDialog, QTableView, QVBoxLayout, QWidget, QPushButton, QHeaderView, QMenuBar,
+                             QAction, QLabel, QHBoxLayout, QAbstractItemView, QMessageBox, QUndoStack, QInputDialog, QDockWidget)
+from PyQt5.QtCore import QSettings, Qt, QTimer
 from PyQt5.QtGui import QIcon
-from os.path import exists, basename, join
-from os import listdir
-from ijson import items, IncompleteJSONError
-from sharedFunctions import sort_json_data
+from os.path import basename
+from time import perf_counter
+from sharedFunctions import sort_json_data, cached_sort_key, price_item, SORT_FIELDS
 from StyleSheet import MENUSTYLE, PAD, BUTTONSTYLE, TITLESTYLE, THEMESTYLE
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    COLUMN_SAMPLE_ROWS = 200
+    MAX_COLUMN_WIDTH = 400
+    DUPLICATE_REPORT_LIMIT = 20
+    FILL_CHUNK_ROWS = 2000
+
+    column_mapping = {
+        "lang": "Language",
+        "release_date": "Release Date",
+        "name": "Name",
+        "type_line": "Type",
+        "color_identity": "Color Identity",
+        "set_name": "Set Name",
+        "set": "Set",
+        "collector_number": "Collector Number",
+        "quantity": "Quantity",
+        "quantity_foil": "Quantity Foil",
+        "usd": "USD",
+        "usd_foil": "USD Foil",
+        "total_usd": "Total USD",
+        "total_usd_foil": "Total USD Foil",
+        "storage_areas": "Storage Areas",
+        "storage_quantity": "Storage Quantity",
+        "deck_type": "Deck Type",
+        "deck_quantity": "Deck Quantity",
+        "deck_type_two": "Deck Type 2",
+        "deck_quantity_two": "Deck Quantity 2",
+        "deck_type_three": "Deck Type 3",
+        "deck_quantity_three": "Deck Quantity 3",
+        "deck_type_four": "Deck Type 4",
+        "deck_quantity_four": "Deck Quantity 4"
+    }
+
+    editable_column_names = {
+        "Language": "lang",
+        "Set": "set", 
+        "Collector Number": "collector_number", 
+        "Quantity": "quantity", 
+        "Quantity Foil": "quantity_foil", 
+        "Storage Areas": "storage_areas",
+        "Deck Type": "deck_type", 
+        "Deck Quantity": "deck_quantity", 
+        "Deck Type 2": "deck_type_two", 
+        "Deck Quantity 2": "deck_quantity_two",
+        "Deck Type 3": "deck_type_three", 
+        "Deck Quantity 3": "deck_quantity_three", 
+        "Deck Type 4": "deck_type_four", 
+        "Deck Quantity 4": "deck_quantity_four"
+    }
+
+    def __init__(self, launch_time=None):
         super().__init__()
+        self.launch_time = launch_time or perf_counter()
+        self.startup_metrics = {}
         self.sort_json_data = sort_json_data
         self.settings = QSettings("HBlaze3", "MTG-Cataloguer")
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setWindowTitle("JSON Viewer")
         self.setGeometry(100, 100, 800, 600)
         
-        if self.settings.value("first_startup", True, type=bool):
-            settings_dialog = SettingsDialog(self)
-            settings_dialog.check_updates()
-            self.settings.setValue("first_startup", False)
         self.langs = ['en', 'es', 'fr', 'de', 'it', 'pt', 'ja', 'ko', 'ru', 'zhs', 'zht', 'ph']
-        self.sets = self.load_local_file('sets.json')
-        self.all_cards = self.load_local_file('all_cards.json')
-        self.DeckList = self.load_local_file('DeckList.json')
-        self.ADFDir = "./AllDeckFiles"
-        self.ADFFiles = [join(self.ADFDir, file) for file in listdir(self.ADFDir)]
-        self.AllDeckFiles = self.load_local_AllDeckFiles(self.ADFFiles)
+        self.sets = []
+        self.all_cards = None
+        self.DeckList = []
+        self.ADFDir = CatalogueLoader.ADF_DIR
+        self.ADFFiles = []
+        self.AllDeckFiles = {}
+        self.catalogue_loader = None
+        self.collection_loader = None
+        self.catalogue = CatalogueHolder(self)
+        self.catalogue.catalogue_changed.connect(self.on_catalogue_changed)
         self.undo_stack = QUndoStack(self)
+        self.valuation = CollectionValuation(self.settings, self)
+        self.valuation.open_files = self.open_files
+        self.valuation.load()
 
-        self.column_mapping = {
-            "lang": "Language",
-            "release_date": "Release Date",
-            "name": "Name",
-            "type_line": "Type",
-            "color_identity": "Color Identity",
-            "set_name": "Set Name",
-            "set": "Set",
-            "collector_number": "Collector Number",
-            "quantity": "Quantity",
-            "quantity_foil": "Quantity Foil",
-            "usd": "USD",
-            "usd_foil": "USD Foil",
-            "total_usd": "Total USD",
-            "total_usd_foil": "Total USD Foil",
-            "storage_areas": "Storage Areas",
-            "storage_quantity": "Storage Quantity",
-            "deck_type": "Deck Type",
-            "deck_quantity": "Deck Quantity",
-            "deck_type_two": "Deck Type 2",
-            "deck_quantity_two": "Deck Quantity 2",
-            "deck_type_three": "Deck Type 3",
-            "deck_quantity_three": "Deck Quantity 3",
-            "deck_type_four": "Deck Type 4",
-            "deck_quantity_four": "Deck Quantity 4"
-        }
-
-        self.editable_column_names = {
-            "Language": "lang",
-            "Set": "set", 
-            "Collector Number": "collector_number", 
-            "Quantity": "quantity", 
-            "Quantity Foil": "quantity_foil", 
-            "Storage Areas": "storage_areas",
-            "Deck Type": "deck_type", 
-            "Deck Quantity": "deck_quantity", 
-            "Deck Type 2": "deck_type_two", 
-            "Deck Quantity 2": "deck_quantity_two",
-            "Deck Type 3": "deck_type_three", 
-            "Deck Quantity 3": "deck_quantity_three", 
-            "Deck Type 4": "deck_type_four", 
-            "Deck Quantity 4": "deck_quantity_four"
-        }
-        
         self.editable_columns = set(self.editable_column_names.values())
         self.title_bar = QWidget(self)
         self.title_bar.setStyleSheet(TITLESTYLE)
@@ -122,6 +141,9 @@ class MainWindow(QMainWindow):
         self.file_convert = QAction("Convert File", self)
         self.file_convert.triggered.connect(self.file_conversion)
         self.file_menu.addAction(self.file_convert)
+        self.duplicates_action = QAction("Find Duplicates", self)
+        self.duplicates_action.triggered.connect(self.find_duplicates)
+        self.file_menu.addAction(self.duplicates_action)
         self.settings_action = QAction("Settings", self)
         self.settings_action.triggered.connect(self.open_settings_dialog)
         self.menu_bar.addAction(self.settings_action)
@@ -137,23 +159,94 @@ class MainWindow(QMainWindow):
         central_layout.addWidget(self.title_bar)
         central_layout.addWidget(self.menu_bar)
         self.tab_widget = TabWidget()
+        self.tab_widget.tab_closing.connect(lambda widget: self.close_journal(widget.findChild(QTableView)))
         central_layout.addWidget(self.tab_widget)
         central_widget = QWidget(self)
         central_widget.setLayout(central_layout)
         self.setCentralWidget(central_widget)
         self.add_precons_tab()
+        self.add_summary_panel()
         self.load_settings()
         self._drag_start_pos = None
         self._drag_start_geometry = None
         self._is_resizing = False
         self._resize_edge = None
-        
+        self.set_catalogue_ready(False)
+
+        if self.settings.value("first_startup", True, type=bool):
+            self.first_startup_dialog = SettingsDialog(self)
+            self.first_startup_dialog.check_updates()
+            self.first_startup_dialog.update_worker.finished.connect(self.load_catalogue)
+            self.settings.setValue("first_startup", False)
+        else:
+            QTimer.singleShot(0, self.load_catalogue)
+        QTimer.singleShot(0, self.valuation.verify)
+
+    def record_metric(self, name):
+        self.startup_metrics[name] = perf_counter() - self.launch_time
+        print(f"Startup metric {name}: {self.startup_metrics[name]:.3f} s")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if "time_to_first_paint" not in self.startup_metrics:
+            self.record_metric("time_to_first_paint")
+
+    def load_catalogue(self):
+        self.catalogue_loader = CatalogueLoader(self)
+        self.catalogue_loader.catalogue_ready.connect(self.on_catalogue_ready)
+        self.catalogue_loader.start()
+
+    def on_catalogue_ready(self, catalogue):
+        errors = catalogue.pop("errors")
+        self.catalogue.swap(catalogue)
+        for filename in errors:
+            QMessageBox.critical(self, "Error", filename + " file not found or corrupted.")
+        self.set_catalogue_ready(True)
+        self.record_metric("catalogue_ready")
+
+    def on_catalogue_changed(self, version):
+        self.sets = self.catalogue.get("sets")
+        self.all_cards = self.catalogue.get("all_cards")
+        self.DeckList = self.catalogue.get("DeckList")
+        self.ADFFiles = self.catalogue.get("ADFFiles")
+        self.AllDeckFiles = self.load_local_AllDeckFiles(self.ADFFiles)
+        self.precons_tab.set_deck_list(self.DeckList)
+        for tab_index in range(1, self.tab_widget.count()):
+            table = self.tab_widget.widget(tab_index).findChild(QTableView)
+            if table is not None and isinstance(table.itemDelegate(), CustomDelegate):
+                table.itemDelegate().set_catalogue(self.all_cards, self.sets)
+        for command_index in range(self.undo_stack.count()):
+            command = self.undo_stack.command(command_index)
+            if isinstance(command, EditCellCommand):
+                command.all_cards = self.all_cards
+
+    def set_catalogue_ready(self, ready):
+        self.catalogue_ready = ready
+        self.load_action.setEnabled(ready)
+        self.precons_tab.submit_button.setEnabled(ready)
+
     def add_precons_tab(self):
-        precons_tab = PreconsTab(self, self.DeckList)
-        tab_index = self.tab_widget.add_tab(precons_tab, "Precons", False)
+        self.precons_tab = PreconsTab(self, self.DeckList)
+        tab_index = self.tab_widget.add_tab(self.precons_tab, "Precons", False)
         self.tab_widget.setCurrentIndex(tab_index)
 
+    def add_summary_panel(self):
+        self.summary_dock = QDockWidget("Summary", self)
+        self.summary_dock.setObjectName("summary_dock")
+        self.summary_dock.setWidget(ValuationPanel(self.valuation, self.summary_dock))
+        self.addDockWidget(Qt.RightDockWidgetArea, self.summary_dock)
+        self.menu_bar.addAction(self.summary_dock.toggleViewAction())
+
+    def open_files(self):
+        files = []
+        for tab_index in range(1, self.tab_widget.count()):
+            table = self.tab_widget.widget(tab_index).findChild(QTableView)
+            if table is not None and table.model().file_path is not None:
+                files.append(table.model().file_path)
+        return files
+
     def load_local_AllDeckFiles(self, file_paths):
+        from ijson import items
         results = {}
         try:
             for file_path in file_paths:
@@ -164,39 +257,8 @@ class MainWindow(QMainWindow):
         except Exception as e:
             return []
 
-    def load_local_file(self, filename):
-        try:
-            with open(filename, 'r') as file:
-                file.readline()
-                if filename == 'all_cards.json':
-                    data = items(file, 'item')
-                    processed_data = {}
-                        
-                    for item in data:
-                            key = (item["lang"], item["set"], item["collector_number"])
-                            processed_data[key] = item
-                    return processed_data
-                return load(file)
-        except (FileNotFoundError, IncompleteJSONError, KeyError):
-            QMessageBox.critical(self, "Error", filename + " file not found or corrupted.")
-            return []
-    
     def get_tab_count(self):
         return self.tab_widget.count()
-    @classmethod
-    def reload_sets(self):
-        self.sets = self.load_local_file(self, 'sets.json')
-    @classmethod
-    def reload_all_cards(self):
-        self.all_cards = self.load_local_file(self, 'all_cards.json')
-    @classmethod
-    def reload_DeckList(self):
-        self.DeckList = self.load_local_file(self, 'DeckList.json')
-    @classmethod
-    def reload_AllDeckFiles(self):
-        self.ADFDir = "./AllDeckFiles"
-        self.ADFFiles = [join(self.ADFDir, file) for file in listdir(self.ADFDir)]
-        self.AllDeckFiles = self.load_local_AllDeckFiles(self.ADFFiles)
 
     def toggle_maximized(self):
         if self.isMaximized():
@@ -207,11 +269,17 @@ class MainWindow(QMainWindow):
             self.fullscreen_button.setText("🗖")
 
     def add_tab(self, tab_name, data):
+        table = self.create_tab(tab_name)
+        table.setModel(CollectionModel(data, self.column_mapping, self.editable_columns, table))
+        self.resize_columns(table)
+
+    def create_tab(self, tab_name):
         tab_name = tab_name.split('/')[-1]
         tab_content = QWidget()
         layout = QVBoxLayout()
-        self.table = QTableWidget()
+        self.table = QTableView()
         self.table.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.delegate = CustomDelegate(all_cards=self.all_cards, parent=self.table, undo_stack=self.undo_stack, editable_columns=self.editable_column_names, sets=self.sets, langs=self.langs)
         self.table.setItemDelegate(self.delegate)
         self.add_button = QPushButton("Add Row")
@@ -224,52 +292,45 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.table)
         layout.addLayout(button_layout)
         tab_content.setLayout(layout)
-        self.populate_table(self.table, data)
         tab_index = self.tab_widget.add_tab(tab_content, tab_name)
         self.tab_widget.setCurrentIndex(tab_index)
+        return self.table
 
-    def populate_table(self, table, data):
-        all_columns = set()
-        for card in data:
-            all_columns.update(card.keys())
-        
-        columns = [col for col in self.column_mapping.keys() if col in all_columns]
-        display_columns = [self.column_mapping[col] for col in columns]
-        table.setColumnCount(len(display_columns))
-        table.setHorizontalHeaderLabels(display_columns)
-        table.setRowCount(len(data))
-
-        for row, card in enumerate(data):
-            for col, column in enumerate(columns):
-                value = card.get(column, "")
-                item = QTableWidgetItem(value)
-                if column in self.editable_columns:
-                    item.setFlags(item.flags() | Qt.ItemIsEditable)
-                else:
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                table.setItem(row, col, item)
-        table.resizeColumnsToContents()
+    def resize_columns(self, table):
+        model = table.model()
+        metrics = table.fontMetrics()
+        rows = model.sample_rows(self.COLUMN_SAMPLE_ROWS)
+        padding = 2 * metrics.horizontalAdvance(" ") + 10
+        for col, column in enumerate(model.columns):
+            width = max([metrics.horizontalAdvance(column[row]) for row in rows] + [metrics.horizontalAdvance(model.headers[col])])
+            table.setColumnWidth(col, min(width + padding, self.MAX_COLUMN_WIDTH))
+
+    def current_table(self):
+        tab = self.tab_widget.currentWidget()
+        return tab.findChild(QTableView) if tab is not None else None
 
     def add_row(self):
-        row_position = self.table.rowCount()
-        self.undo_stack.push(AddRowCommand(self.table, row_position, self.editable_column_names))
+        table = self.current_table()
+        if table is not None and not table.model().loading:
+            self.undo_stack.push(AddRowCommand(table.model(), table.model().rowCount()))
 
     def delete_row(self):
-        selected_row = self.table.currentRow()
+        table = self.current_table()
+        selected_row = table.currentIndex().row() if table is not None and not table.model().loading else -1
         if selected_row >= 0:
-            self.undo_stack.push(DeleteRowCommand(self.table, selected_row))
-            self.table.removeRow(selected_row)
+            self.undo_stack.push(DeleteRowCommand(table.model(), selected_row))
 
     def load_json(self):
         dialog = PathSelectionDialog(self.settings, self)
         if dialog.exec_():
             selected_paths = dialog.get_selected_paths()
+            store = CollectionStore.from_settings(self.settings)
+            files = []
             for file_path, key in selected_paths:
-                if not exists(file_path):
+                if not store.exists(file_path):
                     user_choice = self.handle_missing_file(file_path)
                     if user_choice == "create":
-                        with open(file_path, 'w') as file:
-                            dump([], file)
+                        store.create(file_path)
                     elif user_choice == "change":
                         new_file_path, _ = QFileDialog.getOpenFileName(self, "Select New Path for JSON", "", "JSON Files (*.json)")
                         if new_file_path:
@@ -280,12 +341,80 @@ class MainWindow(QMainWindow):
                             continue
                     else:
                         continue
-                try:
-                    with open(file_path, 'r') as file:
-                        data = load(file)
-                        self.add_tab(key, data)
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to load JSON file: {str(e)}")
+                files.append((key, file_path))
+            if files:
+                self.collection_loader = CollectionLoader(store, self.column_mapping, self)
+                self.collection_loader.file_loaded.connect(self.on_collection_loaded)
+                self.collection_loader.file_failed.connect(self.on_collection_failed)
+                self.collection_loader.load(files)
+
+    def on_collection_loaded(self, key, file_path, keys, columns, journal_state, summary):
+        table = self.create_tab(key)
+        table.setModel(CollectionModel([], self.column_mapping, self.editable_columns, table, keys))
+        table.model().file_path = file_path
+        table.model().valuation = self.valuation
+        table.model().loading = True
+        self.valuation.replace(file_path, summary)
+        store = self.collection_loader.store
+        self.fill_table(table, columns, 0, lambda: self.attach_journal(store, table.model(), file_path, journal_state))
+
+    def attach_journal(self, store, model, file_path, journal_state):
+        if self.tab_widget.indexOf(model.parent().parentWidget()) < 0:
+            return
+        journal = store.open_journal(file_path, journal_state, model)
+        journal.snapshot_source = model.records
+        journal.snapshot_changed.connect(lambda: self.on_snapshot_changed(file_path), Qt.QueuedConnection)
+        unsaved = journal_state["unsaved"]
+        if unsaved:
+            reply = QMessageBox.question(self, "Recover Changes",
+                                         f"{file_path} has {len(unsaved)} unsaved changes from a previous session. Do you want to recover them?",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if reply == QMessageBox.Yes:
+                model.apply_entries(unsaved)
+            else:
+                journal.discard_unsaved()
+        model.journal = journal
+        model.loading = False
+
+    def on_snapshot_changed(self, file_path):
+        QMessageBox.warning(self, "File Changed",
+                            f"{file_path} was changed outside this tab. Edits in this tab are no longer recorded for recovery; "
+                            "close and reopen the tab to load the new version, or save to overwrite it.")
+
+    def fill_table(self, table, columns, start, on_filled=None):
+        try:
+            model = table.model()
+        except RuntimeError:
+            return
+        row_count = len(columns[0]) if columns else 0
+        end = min(start + self.FILL_CHUNK_ROWS, row_count)
+        model.append_rows(columns, start, end)
+        if start == 0:
+            self.resize_columns(table)
+        if end < row_count:
+            QTimer.singleShot(0, lambda: self.fill_table(table, columns, end, on_filled))
+        elif on_filled is not None:
+            on_filled()
+
+    def on_collection_failed(self, file_path, error):
+        QMessageBox.critical(self, "Error", f"Failed to load JSON file {file_path}: {error}")
+
+    def find_duplicates(self):
+        table = self.current_table()
+        if table is None:
+            QMessageBox.warning(self, "No Tab Selected", "Please select a tab to check for duplicates.")
+            return
+        duplicates = table.model().duplicates()
+        if not duplicates:
+            QMessageBox.information(self, "No Duplicates", "No duplicate entries found in this file.")
+            return
+        lines = [f"{lang} {set_code} #{col_num}: rows " + ", ".join(str(row + 1) for row in rows)
+                 for (lang, set_code, col_num), rows in sorted(duplicates.items(), key=lambda item: item[1][0])]
+        message = "\n".join(lines[:self.DUPLICATE_REPORT_LIMIT])
+        if len(lines) > self.DUPLICATE_REPORT_LIMIT:
+            message += f"\n...and {len(lines) - self.DUPLICATE_REPORT_LIMIT} more"
+        QMessageBox.warning(self, "Duplicate Entries", f"Found {len(lines)} duplicate entries:\n{message}")
+        table.selectRow(min(rows[0] for rows in duplicates.values()))
 
     def handle_missing_file(self, file_path):
         message_box = QMessageBox(self)
@@ -305,7 +434,7 @@ class MainWindow(QMainWindow):
         else:
             return "cancel"
 
-    def get_tab_changes(self):
+    def get_tab_target(self):
         tab_index = self.tab_widget.currentIndex()
         if tab_index <= 0:
             QMessageBox.warning(self, "No Tab Selected", "Please select a tab to save.")
@@ -316,26 +445,81 @@ class MainWindow(QMainWindow):
         if not file_path:
             QMessageBox.warning(self, "File Path Not Found", f"No saved file path for tab: {tab_title}")
             return
-        data = self.extract_data_from_table(self.tab_widget.widget(tab_index).findChild(QTableWidget))
+        table = self.tab_widget.widget(tab_index).findChild(QTableView)
+        if table.model().loading:
+            QMessageBox.warning(self, "Still Loading", f"{tab_title} is still loading. Please wait until all rows are shown.")
+            return
+        return tab_title, file_path, table
+
+    def get_tab_changes(self):
+        tab_target = self.get_tab_target()
+        if tab_target is None:
+            return
+        tab_title, file_path, table = tab_target
+        data = self.extract_data_from_table(table)
         if tab_title == "Art":
             sorted_data = self.sort_json_data(data)
         else:
             sorted_data = self.sort_json_data(data, self.all_cards)
         return tab_title, file_path, sorted_data
 
+    def merge_dirty_rows(self, model, dirty_rows, all_cards=None):
+        if all_cards is not None:
+            for row in dirty_rows:
+                model.update_row(row, price_item(model.record(row), all_cards))
+        keys = list(map(cached_sort_key, *(model.columns[model.keys.index(field)] for field in SORT_FIELDS)))
+        dirty = set(dirty_rows)
+        clean = [row for row in range(model.rowCount()) if row not in dirty]
+        clean_keys = [keys[row] for row in clean]
+        if not all(map(le, clean_keys, islice(clean_keys, 1, None))):
+            return sorted(range(model.rowCount()), key=keys.__getitem__)
+        inserts = []
+        for row in dirty_rows:
+            key = keys[row]
+            position = bisect_right(clean, row)
+            if not ((position == 0 or clean_keys[position - 1] <= key) and
+                    (position == len(clean) or key <= clean_keys[position])):
+                position = bisect_right(clean_keys, key)
+            inserts.append((position, key, row))
+        order, previous = [], 0
+        for position, _, row in sorted(inserts):
+            order.extend(clean[previous:position])
+            order.append(row)
+            previous = position
+        order.extend(clean[previous:])
+        return order
+
+    def remap_undo_rows(self, model, mapping):
+        for command_index in range(self.undo_stack.count()):
+            command = self.undo_stack.command(command_index)
+            if getattr(command, "model", None) is model:
+                command.remap_rows(mapping)
+
     def save_changes(self):
-        tab_changes = self.get_tab_changes()
-        if tab_changes is None:
+        tab_target = self.get_tab_target()
+        if tab_target is None:
             return
-        tab_title, file_path, sorted_data = tab_changes
+        tab_title, file_path, table = tab_target
+        model = table.model()
+        if model.journal is not None and model.journal.check_snapshot():
+            reply = QMessageBox.question(self, "File Changed",
+                                         f"{file_path} was changed outside this tab. Do you want to overwrite it with this tab?",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
         try:
-            with open(file_path, 'w') as file:
-                dump(sorted_data, file)
+            dirty_rows = model.dirty_rows()
+            order = self.merge_dirty_rows(model, dirty_rows, None if tab_title == "Art" else self.all_cards)
+            if order != list(range(len(order))):
+                self.remap_undo_rows(model, model.reorder(order, dirty_rows))
+            if model.journal is not None:
+                model.journal.save()
+            else:
+                CollectionStore.from_settings(self.settings).write(file_path, model.records())
+            model.mark_clean()
             QMessageBox.information(self, "Success", f"Changes saved successfully to {file_path}")
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Failed to save JSON file: {str(e)}")
-        self.tab_widget.close_tab(tab_title)
-        self.add_tab(tab_title, sorted_data)
 
     def file_conversion(self):
         platforms = ["Moxfield", "Archidekt", "CardSphere", "DeckBox", "Decked Builder", "DeckStats", 
@@ -430,22 +614,7 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to save CSV: {str(e)}")
     
     def extract_data_from_table(self, table):
-        columns = [table.horizontalHeaderItem(i).text() for i in range(table.columnCount())]
-        display_to_db_column = {v: k for k, v in self.column_mapping.items()}
-        
-        data = []
-        for row in range(table.rowCount()):
-            row_data = {}
-            for col, column in enumerate(columns):
-                item = table.item(row, col)
-                database_name = display_to_db_column.get(column)
-                if database_name:
-                    row_data[database_name] = item.text() if item else ''
-                else:
-                    row_data[column.lower()] = item.text() if item else ''
-            data.append(row_data)
-        
-        return data
+        return table.model().records()
 
     def undo(self):
         self.undo_stack.undo()
@@ -455,10 +624,26 @@ class MainWindow(QMainWindow):
 
     def open_settings_dialog(self):
         dialog = SettingsDialog(self, self.all_cards)
-        if dialog.exec_():
+        accepted = dialog.exec_()
+        dialog.release()
+        if accepted:
             self.toggle_theme()
+            self.valuation.verify()
+
+    def close_journal(self, table):
+        if table is None or table.model().journal is None:
+            return
+        journal, table.model().journal = table.model().journal, None
+        try:
+            journal.compact()
+        except (OSError, ValueError) as e:
+            print(f"Error compacting {journal.snapshot_path}: {e}")
+        journal.close()
 
     def closeEvent(self, event):
+        for tab_index in range(1, self.tab_widget.count()):
+            self.close_journal(self.tab_widget.widget(tab_index).findChild(QTableView))
+        self.valuation.save()
         self.save_settings()
         super().closeEvent(event)
 
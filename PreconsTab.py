@@ -1,13 +1,14 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListWidget, QPushButton, QMessageBox
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QListWidget, QPushButton, QMessageBox, QAbstractItemView
 from PyQt5.QtCore import QSettings
-from json import load, dump
+from json import load
 from os.path import join
-from sharedFunctions import sort_json_data
+from CollectionStore import CollectionStore
+from CollectionValuation import CollectionValuation
+from sharedFunctions import insert_sorted
 
 class PreconsTab(QWidget):
     def __init__(self, main_window, deck_list_file, parent=None):
         super().__init__(parent)
-        self.sort_json_data = sort_json_data
         self.main_window = main_window
         self.deck_list_file = deck_list_file
         self.deck_names, self.deck_files = self.load_deck_names(self.deck_list_file)
@@ -15,6 +16,7 @@ class PreconsTab(QWidget):
         layout = QVBoxLayout()
 
         self.deck_list_widget = QListWidget(self)
+        self.deck_list_widget.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.populate_deck_list(self.deck_names)
         layout.addWidget(self.deck_list_widget)
         self.search_bar = QLineEdit(self)
@@ -26,6 +28,11 @@ class PreconsTab(QWidget):
         layout.addWidget(self.submit_button)
         self.setLayout(layout)
 
+    def set_deck_list(self, deck_list_file):
+        self.deck_list_file = deck_list_file
+        self.deck_names, self.deck_files = self.load_deck_names(self.deck_list_file)
+        self.filter_deck_list()
+
     def load_deck_names(self, file_data):
         try:
             deck_names = []
@@ -46,6 +53,45 @@ class PreconsTab(QWidget):
         filtered_decks = [name for name in self.deck_names if search_term in name.lower()]
         self.populate_deck_list(filtered_decks)
 
+    @staticmethod
+    def get_color(color_id):
+        if "," in color_id:
+            return "Multicolored"
+        match color_id:
+            case "B":
+                return "Black"
+            case "G":
+                return "Green"
+            case "R":
+                return "Red"
+            case "U":
+                return "Blue"
+            case "W":
+                return "White"
+            case "":
+                return "Colorless"
+
+    @staticmethod
+    def card_key(card):
+        return (card.get('lang'), card.get('set'), card.get('collector_number'))
+
+    @staticmethod
+    def merge_cards(existing_data, cards):
+        existing_cards = {}
+        for existing_card in existing_data:
+            existing_cards.setdefault(PreconsTab.card_key(existing_card), existing_card)
+        new_cards = []
+        for card in cards:
+            existing_card = existing_cards.get(PreconsTab.card_key(card))
+            if existing_card is None:
+                new_cards.append(card)
+                existing_cards[PreconsTab.card_key(card)] = card
+                continue
+            existing_card['quantity'] = str(int(existing_card['quantity']) + int(card['quantity']))
+            existing_card['quantity_foil'] = str(int(existing_card['quantity_foil']) + int(card['quantity_foil']) if card['quantity_foil'] else existing_card['quantity_foil'])
+            existing_card['storage_quantity'] = str(int(existing_card['storage_quantity']) + int(card['storage_quantity']))
+        return new_cards
+
     def submit_selection(self):
         if self.main_window.get_tab_count() > 1:
             QMessageBox.warning(self, "Close Tabs", "Please close all other tabs to ensure data consistency.")
@@ -55,67 +101,43 @@ class PreconsTab(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select a deck from the list.")
             return
 
-        selected_deck = selected_items[0].text()
-        deck_index = self.deck_names.index(selected_deck)
-
-        selected_deck_file = self.deck_files[deck_index]
-        deck_file_path = join("./AllDeckFiles", selected_deck_file)
-
-        def get_color(color_id):
-            if "," in color_id:
-                return "Multicolored"
-            match color_id:
-                case "B":
-                    return "Black"
-                case "G":
-                    return "Green"
-                case "R":
-                    return "Red"
-                case "U":
-                    return "Blue"
-                case "W":
-                    return "White"
-                case "":
-                    return "Colorless"
-                
-        try:
-            with open(deck_file_path, 'r', encoding='utf-8') as f:
-                deck_data = load(f)
+        deck_file_paths = [join("./AllDeckFiles", self.deck_files[self.deck_names.index(item.text())]) for item in selected_items]
 
+        try:
             settings = QSettings("HBlaze3", "MTG-Cataloguer")
+            store = CollectionStore.from_settings(settings)
+            json_file_paths = {}
+            cards_by_path = {}
+
+            for deck_file_path in deck_file_paths:
+                with open(deck_file_path, 'r', encoding='utf-8') as f:
+                    deck_data = load(f)
+
+                for card in deck_data:
+                    label = f"paths/{self.get_color(card['color_identity'])}"
+                    if label not in json_file_paths:
+                        json_file_paths[label] = settings.value(label)
+                    json_file_path = json_file_paths[label]
+
+                    if not json_file_path:
+                        QMessageBox.critical(self, "Error", f"Path for {label} not found.")
+                        return
+
+                    cards_by_path.setdefault(json_file_path, []).append(card)
+
+            valuation = CollectionValuation.shared
+            for json_file_path, cards in cards_by_path.items():
+                existing_data = store.read(json_file_path)[0]
+                keys = {self.card_key(card) for card in cards}
+                before = [dict(item) for item in existing_data if self.card_key(item) in keys]
+                new_cards = self.merge_cards(existing_data, cards)
+                after = [item for item in existing_data if self.card_key(item) in keys] + new_cards
+                store.write(json_file_path, insert_sorted(existing_data, new_cards))
+                if valuation is not None:
+                    valuation.update(json_file_path, before, after)
+            if valuation is not None:
+                valuation.verify()
 
-            for card in deck_data:
-                label = f"paths/{get_color(card['color_identity'])}"
-                json_file_path = settings.value(label)
-                
-                if not json_file_path:
-                    QMessageBox.critical(self, "Error", f"Path for {label} not found.")
-                    return
-                
-                with open(json_file_path, 'r', encoding='utf-8') as f:
-                    existing_data = load(f)
-                
-                duplicate_found = False
-                for existing_card in existing_data:
-                    if (existing_card['lang'] == card['lang'] and
-                        existing_card['set'] == card['set'] and
-                        existing_card['collector_number'] == card['collector_number']):
-                        
-                        existing_card['quantity'] = str(int(existing_card['quantity']) + int(card['quantity']))
-                        existing_card['quantity_foil'] = str(int(existing_card['quantity_foil']) + int(card['quantity_foil']) if card['quantity_foil'] else existing_card['quantity_foil'])
-                        existing_card['storage_quantity'] = str(int(existing_card['storage_quantity']) + int(card['storage_quantity']))
-                        
-                        duplicate_found = True
-                        break
-                
-                if not duplicate_found:
-                    existing_data.append(card)
-
-                sorted_data = self.sort_json_data(existing_data)
-
-                with open(json_file_path, 'w', encoding='utf-8') as f:
-                    dump(sorted_data, f)
-
-            QMessageBox.information(self, "Success", "Deck data has been written to the appropriate JSON files.")
+            QMessageBox.information(self, "Success", f"Data from {len(deck_file_paths)} deck(s) has been written to the appropriate JSON files.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to process deck: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,90 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from UpdateProgress import UpdateProgress
+from CollectionValuation import CollectionValuation
+from sharedFunctions import catalogue_cents, format_cents, parse_quantity, sort_json_data
+
+class PriceUpdater:
+    TASK = "JSON Prices"
+    MAX_WORKERS = 4
+    UNPRICED = ("Art",)
+
+    @staticmethod
+    def card_key(item):
+        return (item.get('lang'), item.get('set'), item.get('collector_number'))
+
+    @staticmethod
+    def collect_keys(store, path):
+        data = store.read(path)[0]
+        return {PriceUpdater.card_key(item) for item in data}, len(data)
+
+    @staticmethod
+    def resolve_prices(all_cards, keys):
+        prices = all_cards.lookup(keys, ('usd', 'usd_foil'))
+        return {key: (catalogue_cents(price), catalogue_cents(foil_price)) for key, (price, foil_price) in prices.items()}
+
+    @staticmethod
+    def totals(quantities, foil_quantities, usd, usd_foil):
+        try:
+            import numpy
+        except ImportError:
+            return ([(quantity - foil) * price for quantity, foil, price in zip(quantities, foil_quantities, usd)],
+                    [foil * price for foil, price in zip(foil_quantities, usd_foil)])
+        quantities = numpy.array(quantities, dtype=numpy.int64)
+        foil_quantities = numpy.array(foil_quantities, dtype=numpy.int64)
+        usd = numpy.array(usd, dtype=numpy.int64)
+        usd_foil = numpy.array(usd_foil, dtype=numpy.int64)
+        return ((quantities - foil_quantities) * usd).tolist(), (foil_quantities * usd_foil).tolist()
+
+    @staticmethod
+    def price_rows(rows, prices):
+        row_prices = [prices.get(PriceUpdater.card_key(item), (None, None)) for item in rows]
+        quantities = [parse_quantity(item.get('quantity', '1'), 1, 1) for item in rows]
+        foil_quantities = [parse_quantity(item.get('quantity_foil', '0'), 0, 0) for item in rows]
+        totals, foil_totals = PriceUpdater.totals(quantities, foil_quantities, [price or 0 for price, _ in row_prices],
+                                                  [foil_price or 0 for _, foil_price in row_prices])
+        for item, (price, foil_price), total, foil_total in zip(rows, row_prices, totals, foil_totals):
+            item['total_usd'] = format_cents(total) if total else ""
+            item['total_usd_foil'] = format_cents(foil_total) if foil_total else ""
+            item['usd'] = format_cents(price)
+            item['usd_foil'] = format_cents(foil_price)
+        return rows
+
+    @staticmethod
+    def update_file(store, path, prices):
+        data, journal_state = store.read(path)
+        if journal_state["unsaved"]:
+            return None
+        if prices is not None:
+            PriceUpdater.price_rows(data, prices)
+        store.write(path, sort_json_data(data))
+        return CollectionValuation.summarize(data)
+
+    @staticmethod
+    def update_files(store, files, all_cards, progress=None):
+        progress = progress or UpdateProgress()
+        task = PriceUpdater.TASK
+        with ProcessPoolExecutor(max_workers=max(1, min(PriceUpdater.MAX_WORKERS, len(files)))) as executor:
+            progress.start(task, "read")
+            file_keys, records = {}, 0
+            reads = {executor.submit(PriceUpdater.collect_keys, store, path): (label, path) for label, path in files}
+            for future in as_completed(reads):
+                file_keys[reads[future]], count = future.result()
+                records += count
+                progress.update(task, "read", len(file_keys), len(files), "files", records)
+            progress.finish(task, "read", len(file_keys), len(files), "files", records)
+
+            progress.start(task, "price")
+            keys = set().union(*(keys for (label, path), keys in file_keys.items() if label not in PriceUpdater.UNPRICED))
+            prices = PriceUpdater.resolve_prices(all_cards, keys)
+            progress.finish(task, "price", len(keys), unit="cards", records=len(prices))
+
+            progress.start(task, "write")
+            writes, summaries = {}, {}
+            for (label, path), keys in file_keys.items():
+                file_prices = None if label in PriceUpdater.UNPRICED else {key: prices[key] for key in keys if key in prices}
+                writes[executor.submit(PriceUpdater.update_file, store, path, file_prices)] = path
+            for future in as_completed(writes):
+                summaries[writes[future]] = future.result()
+                progress.update(task, "write", len(summaries), len(writes), "files", records)
+            progress.finish(task, "write", len(writes), len(writes), "files", records)
+        return summaries
\ No newline at end of file
@@ -1,14 +1,16 @@
-from PyQt5.QtWidgets import QDialog, QFormLayout, QHBoxLayout, QLineEdit, QPushButton, QCheckBox, QDialogButtonBox, QFileDialog, QMessageBox, QApplication
-from PyQt5.QtCore import Qt, QSettings, QTimer
-from Startup import Startup
-from json import load, dump
-from sharedFunctions import sort_json_data
+from PyQt5.QtWidgets import QDialog, QFormLayout, QHBoxLayout, QLineEdit, QPushButton, QCheckBox, QDialogButtonBox, QFileDialog, QMessageBox
+from PyQt5.QtCore import QSettings
+from os.path import exists
+from CatalogueHolder import CatalogueHolder
+from CollectionStore import CollectionStore
+from CollectionValuation import CollectionValuation
+from UpdateProgress import UpdateProgress
+from UpdateProgressDialog import UpdateProgressDialog
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None, all_cards=None):
         super().__init__(parent)
         self.all_cards = all_cards
-        self.sort_json_data = sort_json_data
         self.setWindowTitle("Settings")
         self.default_paths = {
             "Art": "./JSONs/A.json",
@@ -36,6 +38,8 @@ class SettingsDialog(QDialog):
 
         self.dark_mode_checkbox = QCheckBox("Dark Mode")
         layout.addRow(self.dark_mode_checkbox)
+        self.sqlite_checkbox = QCheckBox("Store Collections in SQLite Database")
+        layout.addRow(self.sqlite_checkbox)
         self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         self.button_box.accepted.connect(self.accept)
         self.button_box.rejected.connect(self.reject)
@@ -46,32 +50,97 @@ class SettingsDialog(QDialog):
         self.reset_button.clicked.connect(self.reset_to_default)
         self.sort_json_button = QPushButton("Update JSON Prices")
         self.sort_json_button.clicked.connect(self.update_json_data)
+        self.sort_json_button.setEnabled(self.all_cards is not None)
+        if CatalogueHolder.shared is not None:
+            CatalogueHolder.shared.catalogue_changed.connect(self.on_catalogue_changed)
         checkres_layout = QHBoxLayout()
         checkres_layout.addWidget(self.check_updates_button)
         checkres_layout.addWidget(self.sort_json_button)
         checkres_layout.addWidget(self.reset_button)
         layout.addRow(checkres_layout)
+        self.import_button = QPushButton("Import JSON to Database")
+        self.import_button.clicked.connect(self.import_database)
+        self.export_button = QPushButton("Export Database to JSON")
+        self.export_button.clicked.connect(self.export_database)
+        database_layout = QHBoxLayout()
+        database_layout.addWidget(self.import_button)
+        database_layout.addWidget(self.export_button)
+        layout.addRow(database_layout)
         self.setLayout(layout)
         self.load_settings()
     
+    def on_catalogue_changed(self, version):
+        self.all_cards = CatalogueHolder.shared.get("all_cards")
+        self.sort_json_button.setEnabled(self.all_cards is not None)
+
     def update_json_data(self):
+        from PriceUpdater import PriceUpdater
+        from Startup import WorkerThread
+        if self.parent() is not None and self.parent().get_tab_count() > 1:
+            QMessageBox.warning(self, "Close Tabs", "Please close all other tabs to ensure data consistency.")
+            return
+        store = CollectionStore.from_settings(self.settings)
+        files = [(label, self.settings.value(f"paths/{label}")) for label in self.default_paths.keys()]
+        files = [(label, path) for label, path in files if path]
+        self.price_progress = UpdateProgress(self)
+        self.price_dialog = UpdateProgressDialog(self.price_progress, self, "Updating Prices", "Updating collection prices, please wait...")
+        all_cards = CatalogueHolder.shared.borrow("all_cards") if CatalogueHolder.shared is not None else self.all_cards
+        self.price_worker = WorkerThread(target=PriceUpdater.update_files, args=(store, files, all_cards, self.price_progress), parent=self)
+
+        def update_finished():
+            if CatalogueHolder.shared is not None:
+                CatalogueHolder.shared.give_back(all_cards)
+            self.price_dialog.done(0)
+            self.sort_json_button.setEnabled(self.all_cards is not None)
+            if self.price_worker.error is not None:
+                QMessageBox.critical(self, "Error", f"Failed to sort JSON data: {str(self.price_worker.error)}")
+            else:
+                skipped = [path for path, summary in self.price_worker.result.items() if summary is None]
+                if CollectionValuation.shared is not None:
+                    for path, summary in self.price_worker.result.items():
+                        if summary is not None:
+                            CollectionValuation.shared.replace(path, summary)
+                    CollectionValuation.shared.save()
+                if skipped:
+                    QMessageBox.warning(self, "Unsaved Changes", "These files have unsaved changes from a previous session and were not updated. "
+                                        "Open them to recover or discard the changes, then update prices again:\n" + "\n".join(skipped))
+                else:
+                    QMessageBox.information(self, "Success", "JSON data sorted and saved successfully.")
+        self.price_worker.finished.connect(update_finished)
+        self.sort_json_button.setEnabled(False)
+        self.price_dialog.show()
+        self.price_worker.start()
+
+    def database_paths(self):
+        if self.parent() is not None and self.parent().get_tab_count() > 1:
+            QMessageBox.warning(self, "Close Tabs", "Please close all other tabs to ensure data consistency.")
+            return []
+        paths = [self.settings.value(f"paths/{label}") for label in self.default_paths.keys()]
+        return [path for path in paths if path]
+
+    def import_database(self):
+        from SqliteStore import SqliteStore
+        store = SqliteStore(self.settings.value("storage/database", CollectionStore.DATABASE))
+        try:
+            imported = [path for path in self.database_paths() if exists(path)]
+            for path in imported:
+                store.import_json(path)
+            if imported:
+                QMessageBox.information(self, "Import", f"Imported {len(imported)} JSON files into {store.database}.")
+        except Exception as e:
+            QMessageBox.critical(self, "Import Error", f"Failed to import JSON data: {str(e)}")
+
+    def export_database(self):
+        from SqliteStore import SqliteStore
+        store = SqliteStore(self.settings.value("storage/database", CollectionStore.DATABASE))
         try:
-            for label in self.default_paths.keys():
-                path = self.settings.value(f"paths/{label}")
-                
-                if path:
-                    with open(path, 'r') as read_f:
-                        data = load(read_f)
-                        if label == "Art":
-                            sorted_data = self.sort_json_data(data)
-                        else:
-                            sorted_data = self.sort_json_data(data, self.all_cards)
-                    with open(path, 'w') as write_f:
-                        dump(sorted_data, write_f)
+            exported = [path for path in self.database_paths() if store.exists(path)]
+            for path in exported:
+                store.export_json(path)
+            if exported:
+                QMessageBox.information(self, "Export", f"Exported {len(exported)} collections from {store.database}.")
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to sort JSON data: {str(e)}")
-        finally:
-            QMessageBox.information(self, "Success", "JSON data sorted and saved successfully.")
+            QMessageBox.critical(self, "Export Error", f"Failed to export database: {str(e)}")
 
     def check_updates(self):
         if not self.settings.value("first_startup", True, type=bool):
@@ -85,27 +154,25 @@ class SettingsDialog(QDialog):
         else:
             override = True
         
-        wait_message = QMessageBox(self)
-        wait_message.setWindowTitle("Please Wait")
-        wait_message.setText("Downloading updates, please wait...\n*Program may seem frozen")
-        wait_message.setStandardButtons(QMessageBox.NoButton)
-        wait_message.setWindowModality(Qt.ApplicationModal)
-
-        QTimer.singleShot(10, wait_message.exec_)
-        QApplication.processEvents()
-        def perform_update():
-            try:
-                Startup.startup_tasks(override)
-            except Exception as e:
-                QMessageBox.critical(self, "Update Error", f"Failed to update sets: {str(e)}")
-            finally:
-                wait_message.done(0)
+        from Startup import Startup, WorkerThread
+        self.update_progress = UpdateProgress(self)
+        self.progress_dialog = UpdateProgressDialog(self.update_progress, self)
+        self.update_worker = WorkerThread(target=Startup.startup_tasks, args=(override, self.update_progress), parent=self)
+
+        def update_finished():
+            self.progress_dialog.done(0)
+            if self.update_worker.error is not None:
+                QMessageBox.critical(self, "Update Error", f"Failed to update sets: {str(self.update_worker.error)}")
+            else:
                 QMessageBox.information(self, "Update", "Files updated successfully.")
-        QTimer.singleShot(100, perform_update)
+        self.update_worker.finished.connect(update_finished)
+        self.progress_dialog.show()
+        self.update_worker.start()
 
     def load_settings(self):
         self.settings = QSettings("HBlaze3", "MTG-Cataloguer")
         self.dark_mode_checkbox.setChecked(self.settings.value("theme", True, type=bool))
+        self.sqlite_checkbox.setChecked(self.settings.value("storage/backend", "json") == "sqlite")
         for label, default in self.default_paths.items():
             path = self.settings.value(f"paths/{label}", default)
             self.path_fields[label].setText(path)
@@ -113,6 +180,7 @@ class SettingsDialog(QDialog):
     def save_settings(self):
         self.settings = QSettings("HBlaze3", "MTG-Cataloguer")
         self.settings.setValue("theme", self.dark_mode_checkbox.isChecked())
+        self.settings.setValue("storage/backend", "sqlite" if self.sqlite_checkbox.isChecked() else "json")
         for label, line_edit in self.path_fields.items():
             path = line_edit.text()
             self.settings.setValue(f"paths/{label}", path)
@@ -127,10 +195,27 @@ class SettingsDialog(QDialog):
         for label, default in self.default_paths.items():
             self.path_fields[label].setText(default)
         self.dark_mode_checkbox.setChecked(True)
+        self.sqlite_checkbox.setChecked(False)
 
     def accept(self):
         for label in self.default_paths.keys():
             self.settings.setValue(f"paths/{label}", self.path_fields[label].text())
 
         self.settings.setValue("theme", self.dark_mode_checkbox.isChecked())
-        super().accept()
\ No newline at end of file
+        self.settings.setValue("storage/backend", "sqlite" if self.sqlite_checkbox.isChecked() else "json")
+        super().accept()
+
+    def done(self, result):
+        if CatalogueHolder.shared is not None:
+            try:
+                CatalogueHolder.shared.catalogue_changed.disconnect(self.on_catalogue_changed)
+            except TypeError:
+                pass
+        super().done(result)
+
+    def release(self):
+        for worker in (getattr(self, "price_worker", None), getattr(self, "update_worker", None)):
+            if worker is not None and worker.isRunning():
+                worker.finished.connect(lambda: (worker.wait(), self.release()))
+                return
+        self.deleteLater()
\ No newline at end of file
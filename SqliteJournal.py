@@ -0,0 +1,65 @@
+from json import dumps
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class SqliteJournal(QObject):
+    snapshot_changed = pyqtSignal()
+
+    def __init__(self, store, file_path, key, version, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.snapshot_path = file_path
+        self.key = key
+        self.version = version
+        self.snapshot_source = None
+        self.detached = False
+        self.connection = None
+
+    def open_connection(self):
+        if self.connection is None:
+            self.connection = self.store.connect()
+        return self.connection
+
+    def check_snapshot(self):
+        if self.detached:
+            return True
+        if self.store.version(self.open_connection(), self.key) != self.version:
+            self.detached = True
+            self.snapshot_changed.emit()
+            return True
+        return False
+
+    def rebase(self):
+        connection = self.open_connection()
+        with connection:
+            self.store.replace_rows(connection, self.key, self.snapshot_source())
+        self.version = self.store.version(connection, self.key)
+        self.detached = False
+
+    def append(self, entry):
+        if self.check_snapshot():
+            return
+        with self.connection:
+            self.connection.execute("INSERT INTO journal (file, entry) VALUES (?, ?)", (self.key, dumps(entry)))
+
+    def save(self):
+        if self.check_snapshot():
+            self.rebase()
+            return
+        with self.connection:
+            self.store.apply_journal(self.connection, self.key)
+
+    def discard_unsaved(self):
+        if self.check_snapshot():
+            return
+        with self.open_connection():
+            self.connection.execute("DELETE FROM journal WHERE file = ?", (self.key,))
+
+    def compact(self):
+        if self.connection is not None:
+            self.connection.execute("PRAGMA optimize")
+        self.close()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
\ No newline at end of file
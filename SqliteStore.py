@@ -0,0 +1,164 @@
+from contextlib import closing
+from json import dumps, loads
+from os import makedirs
+from os.path import abspath, dirname, exists, normcase, relpath
+from sqlite3 import connect, IntegrityError
+from CollectionJournal import CollectionJournal
+from CollectionStore import CollectionStore
+from SqliteJournal import SqliteJournal
+
+class SqliteStore(CollectionStore):
+    FIELDS = ("lang", "release_date", "name", "type_line", "color_identity", "set_name", "set", "collector_number",
+              "quantity", "quantity_foil", "usd", "usd_foil", "total_usd", "total_usd_foil", "storage_areas",
+              "storage_quantity", "deck_type", "deck_quantity", "deck_type_two", "deck_quantity_two",
+              "deck_type_three", "deck_quantity_three", "deck_type_four", "deck_quantity_four")
+    COLUMNS = ", ".join(f'"{field}"' for field in FIELDS)
+    SCHEMA = f"""
+        CREATE TABLE IF NOT EXISTS collections (file TEXT PRIMARY KEY, version INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS cards (id INTEGER PRIMARY KEY, file TEXT NOT NULL, position INTEGER NOT NULL, {COLUMNS}, extra TEXT);
+        CREATE UNIQUE INDEX IF NOT EXISTS cards_key ON cards ("lang", "set", "collector_number", file)
+            WHERE "lang" <> '' AND "set" <> '' AND "collector_number" <> '';
+        CREATE INDEX IF NOT EXISTS cards_position ON cards (file, position);
+        CREATE TABLE IF NOT EXISTS journal (id INTEGER PRIMARY KEY, file TEXT NOT NULL, entry TEXT NOT NULL);
+    """
+
+    def __init__(self, database):
+        self.database = database
+
+    @staticmethod
+    def row_values(record):
+        extra = {key: value for key, value in record.items()
+                 if key not in SqliteStore.FIELDS or not isinstance(value, (str, int, float, type(None)))}
+        return [None if key in extra else record.get(key) for key in SqliteStore.FIELDS] + [dumps(extra) if extra else None]
+
+    @staticmethod
+    def to_record(row):
+        record = {key: value for key, value in zip(SqliteStore.FIELDS, row) if value is not None}
+        if row[-1]:
+            record.update(loads(row[-1]))
+        return record
+
+    def collection_key(self, file_path):
+        try:
+            return normcase(relpath(abspath(file_path), dirname(abspath(self.database))))
+        except ValueError:
+            return normcase(abspath(file_path))
+
+    def connect(self):
+        if dirname(self.database):
+            makedirs(dirname(self.database), exist_ok=True)
+        connection = connect(self.database, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def version(self, connection, key):
+        row = connection.execute("SELECT version FROM collections WHERE file = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def exists(self, file_path):
+        with closing(self.connect()) as connection:
+            return self.version(connection, self.collection_key(file_path)) is not None or exists(file_path)
+
+    def create(self, file_path):
+        self.write(file_path, [])
+
+    def signature(self, file_path):
+        key = self.collection_key(file_path)
+        with closing(self.connect()) as connection:
+            version = self.version(connection, key)
+            if version is None:
+                return CollectionStore.signature(self, file_path)
+            return [version] + list(connection.execute("SELECT COUNT(*), MAX(id) FROM journal WHERE file = ?", (key,)).fetchone())
+
+    def read(self, file_path):
+        key = self.collection_key(file_path)
+        with closing(self.connect()) as connection:
+            if self.version(connection, key) is None:
+                with connection:
+                    self.replace_rows(connection, key, CollectionJournal.read(file_path)[0])
+            rows = connection.execute(f"SELECT {self.COLUMNS}, extra FROM cards WHERE file = ? ORDER BY position", (key,))
+            data = [self.to_record(row) for row in rows]
+            unsaved = [loads(entry) for (entry,) in connection.execute("SELECT entry FROM journal WHERE file = ? ORDER BY id", (key,))]
+            return data, {"signature": self.version(connection, key), "unsaved": unsaved}
+
+    def write(self, file_path, data):
+        with closing(self.connect()) as connection, connection:
+            self.replace_rows(connection, self.collection_key(file_path), data)
+
+    def import_json(self, file_path):
+        self.write(file_path, CollectionJournal.read(file_path)[0])
+
+    def export_json(self, file_path):
+        CollectionJournal.write_snapshot(file_path, self.read(file_path)[0])
+
+    def open_journal(self, file_path, state, parent=None):
+        return SqliteJournal(self, file_path, self.collection_key(file_path), state["signature"], parent)
+
+    def replace_rows(self, connection, key, data):
+        connection.execute("DELETE FROM cards WHERE file = ?", (key,))
+        connection.execute("DELETE FROM journal WHERE file = ?", (key,))
+        try:
+            self.insert_rows(connection, key, enumerate(data))
+        except IntegrityError as e:
+            raise ValueError(f"{key} has duplicate entries; merge them with Find Duplicates first") from e
+        connection.execute("INSERT INTO collections (file, version) VALUES (?, 1) "
+                           "ON CONFLICT (file) DO UPDATE SET version = version + 1", (key,))
+
+    def insert_rows(self, connection, key, rows):
+        placeholders = ", ".join("?" * (len(self.FIELDS) + 1))
+        connection.executemany(f"INSERT INTO cards (file, position, {self.COLUMNS}, extra) VALUES (?, ?, {placeholders})",
+                               ([key, position] + self.row_values(record) for position, record in rows))
+
+    def update_rows(self, connection, changes):
+        if not changes:
+            return
+        records = {}
+        for row_id, changed in changes.items():
+            row = connection.execute(f"SELECT {self.COLUMNS}, extra FROM cards WHERE id = ?", (row_id,)).fetchone()
+            records[row_id] = self.to_record(row)
+            records[row_id].update(changed)
+        connection.executemany('UPDATE cards SET "lang" = NULL WHERE id = ?', [(row_id,) for row_id in records])
+        assignments = ", ".join(f'"{field}" = ?' for field in self.FIELDS)
+        connection.executemany(f"UPDATE cards SET {assignments}, extra = ? WHERE id = ?",
+                               [self.row_values(record) + [row_id] for row_id, record in records.items()])
+
+    def apply(self, connection, key, entries):
+        positions = dict(connection.execute("SELECT id, position FROM cards WHERE file = ? ORDER BY position", (key,)))
+        ids = list(positions)
+        changes, added, deleted = {}, {}, []
+        for entry in entries:
+            match entry["op"]:
+                case "edit":
+                    row_id = ids[entry["row"]]
+                    (added[row_id] if row_id < 0 else changes.setdefault(row_id, {}))[entry["key"]] = entry["value"]
+                case "update":
+                    row_id = ids[entry["row"]]
+                    (added[row_id] if row_id < 0 else changes.setdefault(row_id, {})).update(entry["record"])
+                case "insert":
+                    row_id = -len(added) - len(deleted) - 1
+                    added[row_id] = dict(entry["record"])
+                    ids.insert(entry["row"], row_id)
+                case "delete":
+                    row_id = ids.pop(entry["row"])
+                    if row_id < 0:
+                        del added[row_id]
+                    else:
+                        changes.pop(row_id, None)
+                    deleted.append(row_id)
+                case "move":
+                    ids = [ids[row] for row in CollectionJournal.moved_order(len(ids), entry["rows"], entry["to"])]
+        connection.executemany("DELETE FROM cards WHERE id = ?", [(row_id,) for row_id in deleted if row_id > 0])
+        self.update_rows(connection, changes)
+        connection.executemany("UPDATE cards SET position = ? WHERE id = ?",
+                               [(position, row_id) for position, row_id in enumerate(ids) if row_id > 0 and positions[row_id] != position])
+        self.insert_rows(connection, key, [(position, added[row_id]) for position, row_id in enumerate(ids) if row_id < 0])
+
+    def apply_journal(self, connection, key):
+        entries = [loads(entry) for (entry,) in connection.execute("SELECT entry FROM journal WHERE file = ? ORDER BY id", (key,))]
+        try:
+            self.apply(connection, key, entries)
+        except IntegrityError as e:
+            raise ValueError(f"{key} has duplicate entries; merge them with Find Duplicates first") from e
+        connection.execute("DELETE FROM journal WHERE file = ?", (key,))
\ No newline at end of file
@@ -1,56 +1,61 @@
-from json import load, dump
-from os import remove, listdir
-from os.path import exists, join
-from gzip import GzipFile
-import zipfile
-from ijson import items
-from requests import get
-from scrython.sets import Sets
+from json import load, dump, dumps
+from os import remove, replace
+from os import fstat
+from os.path import exists, getsize, splitext
+from hashlib import sha256
+from CardIndex import CardIndex, CardIndexWriter
+from CatalogueHolder import CatalogueHolder
+from DownloadScheduler import DownloadScheduler
+from IngestPipeline import IngestPipeline
+from UpdateProgress import UpdateProgress
 from PyQt5.QtCore import QThread
+from sharedFunctions import catalogue_cents, parse_cents
 
 class WorkerThread(QThread):
-    def __init__(self, target, args=(), kwargs=None):
-        super().__init__()
+    def __init__(self, target, args=(), kwargs=None, parent=None):
+        super().__init__(parent)
         self.target = target
         self.args = args
         self.kwargs = kwargs or {}
+        self.result = None
+        self.error = None
 
     def run(self):
-        self.target(*self.args, **self.kwargs)
+        try:
+            self.result = self.target(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = e
 
 class Startup:
+    DELTA_LIMIT = 0.25
+    WRITE_BUFFER = 1 << 20
+    CHUNK_SIZE = 1 << 20
+    MAX_CONCURRENCY = 3
+
     @staticmethod
-    def startup_tasks(override=False):
-        tasks = [
-            WorkerThread(target=Startup.fetch_sets, args=(Sets().data(), override,)),
-            WorkerThread(target=Startup.download_file, args=(
-                Startup.get_bulk_data_url(), 
-                "all_cards.json", 
-                override,
-                1,
-            )),
-            WorkerThread(target=Startup.download_file, args=(
-                "https://mtgjson.com/api/v5/AllDeckFiles.zip", 
-                "AllDeckFiles.zip",
-                override,
-                2,
-            )),
-            WorkerThread(target=Startup.download_file, args=(
-                "https://mtgjson.com/api/v5/DeckList.json", 
-                "DeckList.json",
-                override,
-                3,
-            ))
-        ]
-
-        for task in tasks:
-            task.start()
-            
-        for task in tasks:
-            task.wait()
-
-        precon_path = './AllDeckFiles'
-        Startup.rewrite_json([join(precon_path, file) for file in listdir(precon_path)])
+    def startup_tasks(override=False, progress=None):
+        progress = progress or UpdateProgress()
+        with DownloadScheduler(Startup.MAX_CONCURRENCY, progress=progress) as scheduler:
+            tasks = [
+                scheduler.submit("sets.json", Startup.fetch_sets, scheduler, override),
+                scheduler.submit("all_cards.json", Startup.download_all_cards, scheduler, override),
+                scheduler.submit("AllDeckFiles.zip", Startup.download_file, scheduler,
+                    "https://mtgjson.com/api/v5/AllDeckFiles.zip",
+                    "AllDeckFiles.zip",
+                    override,
+                    2,
+                ),
+                scheduler.submit("DeckList.json", Startup.download_file, scheduler,
+                    "https://mtgjson.com/api/v5/DeckList.json",
+                    "DeckList.json",
+                    override,
+                    3,
+                )
+            ]
+            scheduler.wait(tasks)
+
+        if exists("AllDeckFiles.zip"):
+            Startup.rewrite_json("AllDeckFiles.zip", progress=progress, override=override)
         
     @staticmethod
     def date_check(filename, recent_date):
@@ -61,18 +66,22 @@ class Startup:
                 stored_date = file.readline().strip()
                 if stored_date == recent_date:
                     return False
+                return True
         except (FileNotFoundError, KeyError):
             return True
         
     @staticmethod
-    def fetch_sets(sets_data, override):
+    def fetch_sets(scheduler, override):
+        with scheduler.request("https://api.scryfall.com/sets") as response:
+            response.raise_for_status()
+            sets_data = response.json()['data']
+
         def save_sets():
             sets = [s['code'] for s in sets_data if not s['digital']]
             with open(filename, 'w') as file:
                 file.write(f"{recent_date}\n")
                 dump(sets, file)
-            from MainWindow import MainWindow
-            MainWindow.reload_sets()
+            CatalogueHolder.reload("sets")
 
         filename = 'sets.json'
         recent_date = max(s['released_at'] for s in sets_data if not s['digital'])
@@ -86,12 +95,11 @@ class Startup:
             save_sets()
 
     @staticmethod
-    def get_bulk_data_url():
+    def get_bulk_data_url(scheduler):
         try:
-            response = get("https://api.scryfall.com/bulk-data")
-            response.raise_for_status()
-
-            bulk_data = response.json()
+            with scheduler.request("https://api.scryfall.com/bulk-data") as response:
+                response.raise_for_status()
+                bulk_data = response.json()
             for item in bulk_data['data']:
                 if item['type'] == 'all_cards':
                     return [item['download_uri'], item['updated_at']]
@@ -109,70 +117,303 @@ class Startup:
             meta_file.write(f"{metadata}\n")
 
     @staticmethod
-    def download_file(url, save_as, override, step=None):
-        def fetch_response():
-            response = get(url[0] if save_as == "all_cards.json" else url, stream=True)
-            response.raise_for_status()
-            return response
-        
+    def validators_path(save_as):
+        return splitext(save_as)[0] + ".http"
+
+    @staticmethod
+    def read_validators(file_path):
         try:
-            response = fetch_response()
-            last_modified = response.headers.get('Last-Modified')
+            with open(file_path, 'r', encoding='utf-8') as file:
+                return load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def write_validators(file_path, validators):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            dump(validators, file)
+
+    @staticmethod
+    def has_local_copy(save_as):
+        if ".zip" in save_as:
+            return exists(save_as[:-4])
+        return exists(save_as)
+
+    @staticmethod
+    def expected_size(response, offset):
+        content_range = response.headers.get('Content-Range')
+        if response.status_code == 206 and content_range and not content_range.endswith('/*'):
+            return int(content_range.rsplit('/', 1)[1])
+        content_length = response.headers.get('Content-Length')
+        return offset + int(content_length) if content_length else None
+
+    @staticmethod
+    def checksum_url(url):
+        return url + ".sha256" if "mtgjson.com" in url else None
+
+    @staticmethod
+    def fetch_checksum(scheduler, url):
+        if Startup.checksum_url(url) is None:
+            return None
+        try:
+            with scheduler.request(Startup.checksum_url(url)) as response:
+                response.raise_for_status()
+                return response.text.split()[0].lower()
+        except Exception as e:
+            return None
+
+    @staticmethod
+    def file_sha256(file_path):
+        digest = sha256()
+        with open(file_path, 'rb') as file:
+            while chunk := file.read(Startup.CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fetch_file(scheduler, url, download_path, validators=None, task=None):
+        part_path = download_path + ".part"
+        part_validators = Startup.read_validators(part_path + ".http")
+        headers = {}
+        if Startup.checksum_url(url) is not None:
+            headers['Accept-Encoding'] = 'identity'
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        offset = getsize(part_path) if exists(part_path) and part_validators.get('url') == url else 0
+        if offset and (part_validators.get('etag') or part_validators.get('last_modified')):
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = part_validators.get('etag') or part_validators['last_modified']
+        else:
+            offset = 0
+
+        with scheduler.request(url, headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                return None
+            if response.status_code == 416 and offset:
+                complete = response.headers.get('Content-Range', '').rsplit('/', 1)[-1] == str(offset)
+                fetched, expected_size = (part_validators, offset) if complete else (None, None)
+            else:
+                fetched, expected_size = Startup.stream_part(scheduler, response, url, part_path, offset, task or download_path)
+        if fetched is None:
+            remove(part_path)
+            remove(part_path + ".http")
+            return Startup.fetch_file(scheduler, url, download_path, validators, task)
+        return Startup.finish_fetch(scheduler, url, part_path, download_path, fetched, expected_size)
+
+    @staticmethod
+    def stream_part(scheduler, response, url, part_path, offset, task):
+        response.raise_for_status()
+        if response.status_code != 206:
+            offset = 0
+        fetched = {
+            "url": url,
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified')
+        }
+        Startup.write_validators(part_path + ".http", fetched)
+        expected_size = Startup.expected_size(response, offset)
+        progress = scheduler.progress or UpdateProgress()
+        received = offset
+        progress.start(task, "download")
+        with open(part_path, 'ab' if offset else 'wb') as file:
+            for chunk in response.raw.stream(Startup.CHUNK_SIZE, decode_content=False):
+                file.write(chunk)
+                received += len(chunk)
+                progress.update(task, "download", received, expected_size or 0)
+        progress.finish(task, "download", received, expected_size or 0)
+        return fetched, expected_size
 
-            def download_and_save():
+    @staticmethod
+    def finish_fetch(scheduler, url, part_path, download_path, fetched, expected_size):
+        size = getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            raise IOError(f"incomplete download, received {size} of {expected_size} bytes")
+        checksum = Startup.fetch_checksum(scheduler, url)
+        if checksum and Startup.file_sha256(part_path) != checksum:
+            remove(part_path)
+            remove(part_path + ".http")
+            raise IOError("checksum mismatch")
+        replace(part_path, download_path)
+        remove(part_path + ".http")
+        return fetched
+
+    @staticmethod
+    def download_all_cards(scheduler, override):
+        url = Startup.get_bulk_data_url(scheduler)
+        if url is None:
+            print("Error downloading all_cards.json: bulk data URL unavailable")
+            return
+        Startup.download_file(scheduler, url, "all_cards.json", override, 1)
+
+    @staticmethod
+    def download_file(scheduler, url, save_as, override, step=None):
+        try:
+            validators = None
+            if save_as == "all_cards.json":
+                download_url, date = url
+                dated_file = CardIndex.delta_path(save_as) if exists(CardIndex.delta_path(save_as)) else save_as
+                if not (override or not exists(save_as) or Startup.date_check(dated_file, date)):
+                    return
+            else:
+                download_url = url
+                if not override and Startup.has_local_copy(save_as):
+                    validators = Startup.read_validators(Startup.validators_path(save_as))
+
+            download_path = save_as + ".download"
+            fetched = Startup.fetch_file(scheduler, download_url, download_path, validators, save_as)
+            if fetched is None:
+                return
+            try:
                 if save_as == "all_cards.json":
-                    Startup.process_all_cards(response, save_as, url[1])
+                    with open(download_path, 'rb') as source:
+                        if override or not exists(save_as):
+                            Startup.process_all_cards(source, save_as, date, scheduler.progress)
+                        else:
+                            Startup.refresh_all_cards(source, save_as, date, scheduler.progress)
                 else:
-                    Startup.process_other_files(response, save_as, last_modified)
-
-            if override or not exists(save_as) or Startup.date_check(save_as, url[1] if save_as == "all_cards.json" else last_modified):
-                download_and_save()
+                    Startup.process_other_files(download_path, save_as, fetched['last_modified'])
+            finally:
+                if exists(download_path):
+                    remove(download_path)
+            Startup.write_validators(Startup.validators_path(save_as), fetched)
 
         except Exception as e:
             print(f"Error downloading {save_as}: {e}")
 
     @staticmethod
-    def process_all_cards(response, save_as, date):
-        with Startup.get_gzip_file(response) as gzip_file:
+    def index_writers(save_as):
+        return {
+            CardIndex.index_path(save_as): CardIndexWriter(CardIndex.FIELDS),
+            CardIndex.dates_path(save_as): CardIndexWriter(CardIndex.DATE_FIELDS)
+        }
+
+    @staticmethod
+    def finish_indexes(index_writers, date):
+        for index_path, index_writer in index_writers.items():
+            index_writer.finish(index_path, date)
+
+    @staticmethod
+    def write_cards(file, cards, index_writers):
+        file.write('[\n')
+        first = True
+        for card in cards:
+            for index_writer in index_writers.values():
+                index_writer.add(card)
+            if not first:
+                file.write(',\n')
+            first = False
+            dump(card, file)
+        file.write('\n]')
+
+    @staticmethod
+    def ingest_progress(source, save_as, progress):
+        total = fstat(source.fileno()).st_size
+        progress.start(save_as, "ingest")
+        return lambda throughput: progress.update(save_as, "ingest", source.tell(), total, "B", throughput.cards)
+
+    @staticmethod
+    def process_all_cards(source, save_as, date, progress=None):
+        progress = progress or UpdateProgress()
+        report = Startup.ingest_progress(source, save_as, progress)
+        index_writers = Startup.index_writers(save_as)
+        with Startup.get_gzip_file(source) as gzip_file:
             Startup.write_metadata(save_as, date, 'w')
-            with open(save_as, 'r+', encoding='utf-8') as file:
-                file.readline()
+            with open(save_as, 'a', encoding='utf-8', buffering=Startup.WRITE_BUFFER) as file:
                 file.write('[\n')
-                first = True
+                separator = ''
+                def write_batch(cards):
+                    nonlocal separator
+                    for card in cards:
+                        for index_writer in index_writers.values():
+                            index_writer.add(card)
+                    file.write(separator + ',\n'.join(dumps(card) for card in cards))
+                    separator = ',\n'
+                throughput = IngestPipeline(gzip_file, Startup.create_processed_card, write_batch, on_batch=report).run()
+                file.write('\n]')
+            ingested = source.tell()
+        progress.finish(save_as, "ingest", ingested, unit="B", records=throughput.cards)
+        print(f"Processed {save_as}: {throughput}")
+        Startup.finish_indexes(index_writers, date)
+        if exists(CardIndex.delta_path(save_as)):
+            remove(CardIndex.delta_path(save_as))
+        CatalogueHolder.reload("all_cards")
 
-                for card in items(gzip_file, 'item'):
-                    processed_card = Startup.create_processed_card(card)
-                    if not first:
-                        file.write(',\n')
-                    first = False
-                    dump(processed_card, file)
+    @staticmethod
+    def refresh_all_cards(source, save_as, date, progress=None):
+        progress = progress or UpdateProgress()
+        card_index = CardIndex.load(save_as, apply_delta=False)
+        if card_index is None:
+            return Startup.process_all_cards(source, save_as, date, progress)
+        report = Startup.ingest_progress(source, save_as, progress)
+        prices = {key: (catalogue_cents(usd), catalogue_cents(usd_foil)) for key, (usd, usd_foil) in card_index.scan(("usd", "usd_foil"))}
+        changed = []
+        added = []
+        def compare_batch(cards):
+            for processed_card in cards:
+                key = (processed_card['lang'], processed_card['set'], processed_card['collector_number'])
+                current_prices = prices.get(key)
+                if current_prices is None:
+                    added.append(processed_card)
+                elif current_prices != (processed_card['usd'], processed_card['usd_foil']):
+                    changed.append((key, processed_card['usd'], processed_card['usd_foil']))
+        with Startup.get_gzip_file(source) as gzip_file:
+            throughput = IngestPipeline(gzip_file, Startup.create_processed_card, compare_batch, on_batch=report).run()
+            ingested = source.tell()
+        progress.finish(save_as, "ingest", ingested, unit="B", records=throughput.cards)
+        delta_cards = []
+        for key, usd, usd_foil in changed:
+            card = card_index[key]
+            card['usd'] = usd
+            card['usd_foil'] = usd_foil
+            delta_cards.append(card)
+        delta_cards.extend(added)
+        print(f"Refreshed {save_as}: {len(changed)} price changes, {len(added)} new printings")
 
-                file.write('\n]')
-        from MainWindow import MainWindow
-        MainWindow.reload_all_cards()
+        if len(delta_cards) > len(card_index) * Startup.DELTA_LIMIT:
+            card_index.apply_delta(delta_cards)
+            Startup.compact_all_cards(card_index, save_as, date)
+        else:
+            delta_path = CardIndex.delta_path(save_as)
+            Startup.write_metadata(delta_path + ".tmp", date, 'w')
+            with open(delta_path + ".tmp", 'a', encoding='utf-8') as file:
+                dump({"base": card_index.date, "changed": len(changed), "added": len(added), "cards": delta_cards}, file)
+            card_index.close()
+            replace(delta_path + ".tmp", delta_path)
+        CatalogueHolder.reload("all_cards")
 
     @staticmethod
-    def get_gzip_file(response):
-        if 'Content-Encoding' in response.headers and response.headers['Content-Encoding'] == 'gzip':
-            return GzipFile(fileobj=response.raw)
-        content = response.raw.read(2)
-        response.raw.seek(0)
+    def compact_all_cards(card_index, save_as, date):
+        index_writers = Startup.index_writers(save_as)
+        Startup.write_metadata(save_as + ".tmp", date, 'w')
+        with open(save_as + ".tmp", 'a', encoding='utf-8') as file:
+            Startup.write_cards(file, card_index.cards(), index_writers)
+        card_index.close()
+        replace(save_as + ".tmp", save_as)
+        Startup.finish_indexes(index_writers, date)
+        if exists(CardIndex.delta_path(save_as)):
+            remove(CardIndex.delta_path(save_as))
+
+    @staticmethod
+    def get_gzip_file(source):
+        content = source.read(2)
+        source.seek(0)
         if content == b'\x1f\x8b':
-            return GzipFile(fileobj=response.raw)
-        return response.raw
+            from gzip import GzipFile
+            return GzipFile(fileobj=source)
+        return source
 
     @staticmethod
-    def process_other_files(response, save_as, last_modified):
+    def process_other_files(download_path, save_as, last_modified):
         if ".zip" in save_as:
-            Startup.write_metadata(save_as[:-4] + ".meta", last_modified)
-            Startup.save_file(save_as, response.raw.read())
-            Startup.extract_zip(save_as)
+            Startup.write_metadata(save_as[:-4] + ".meta", last_modified, 'w')
+            replace(download_path, save_as)
         else:
-            if Startup.get_gzip_file(response):
-                with Startup.get_gzip_file(response) as gzip_file:
+            with open(download_path, 'rb') as source:
+                with Startup.get_gzip_file(source) as gzip_file:
                     Startup.save_file(save_as, gzip_file.read(), mode='wb')
-            else:
-                Startup.save_file(save_as, response.raw.read())
             if save_as == "DeckList.json":
                 Startup.process_deck_list(save_as, last_modified)
             else:
@@ -193,8 +434,7 @@ class Startup:
             f.write(f"{last_modified}\n")
             dump(deck_data, f)
             f.truncate()
-        from MainWindow import MainWindow
-        MainWindow.reload_DeckList()
+        CatalogueHolder.reload("DeckList")
 
     @staticmethod
     def create_processed_card(card):
@@ -207,110 +447,17 @@ class Startup:
             "set_name": card.get("set_name"),
             "set": card.get("set"),
             "collector_number": card.get("collector_number"),
-            "usd": card.get("prices", {}).get("usd"),
-            "usd_foil": card.get("prices", {}).get("usd_foil"),
+            "usd": parse_cents(card.get("prices", {}).get("usd")),
+            "usd_foil": parse_cents(card.get("prices", {}).get("usd_foil")),
         }
     
     @staticmethod
-    def extract_zip(zip_File):
-        try:
-            with zipfile.ZipFile(zip_File, 'r') as zip_ref:
-                zip_ref.extractall("./"+zip_File[:-4])
-        finally:
-            if exists(zip_File):
-                remove(zip_File)
-
-    @staticmethod
-    def rewrite_json(file_paths):
-        try:
-            with open('all_cards.json', 'r', encoding='utf-8') as f:
-                f.readline()
-                all_cards_data = { 
-                    (card['lang'], card['set'], card['collector_number']): card["release_date"]
-                    for card in items(f, 'item')
-                }
-                
-            for file_path in file_paths:
-                with open(file_path, 'r+', encoding='utf-8') as file:
-                    data = items(file, 'data')
-                    deck = []
-                    data = list(data)[0]
-                    if data['commander']:
-                        commander = data['commander'][0]
-                        card_data = Startup.create_card_data_dict(commander, all_cards_data)
-                        deck.append(card_data)
-                    for card in data['mainBoard']:
-                        card_data = Startup.create_card_data_dict(card, all_cards_data)
-                        deck.append(card_data)
-                    file.seek(0)
-                    dump(deck, file)
-                    file.truncate()
-            from MainWindow import MainWindow
-            MainWindow.reload_AllDeckFiles()
-        except Exception as e:
-            return e
-    
-    @staticmethod
-    def get_language_code(lang):
-        match lang:
-            case "Spanish":
-                return "es"
-            case "French":
-                return "fr"
-            case "German":
-                return "de"
-            case "Italian":
-                return "it"
-            case "Portuguese (Brazil)":
-                return "pt"
-            case "Japanese":
-                return "ja"
-            case "Korean":
-                return "ko"
-            case "Russian":
-                return "ru"
-            case "Chinese Simplified":
-                return "zhs"
-            case "Chinese Traditional":
-                return "zht"
-            case "Phyrexian":
-                return "ph"
-        return "en"
-
-    @staticmethod
-    def create_card_data_dict(card_info, all_cards_data):
+    def rewrite_json(zip_path, precon_path='./AllDeckFiles', progress=None, override=False):
+        from DeckRewriter import DeckRewriter
         try:
-            quantity = str(card_info['count'])
-            quantity_foil = quantity if card_info.get('isFoil') else ""
-            lang = Startup.get_language_code(card_info['language'])
-            setCode = str(card_info['setCode']).lower()
-            card_key = (lang, setCode, card_info['number'])
-            release_date = all_cards_data.get(card_key)
-            return {
-                "lang": lang,
-                "release_date": release_date,
-                "name": card_info['name'],
-                "type_line": card_info['type'],
-                "color_identity": ','.join(card_info['colorIdentity']),
-                "set_name": "",
-                "set": setCode,
-                "collector_number": card_info['number'],
-                "quantity": quantity,
-                "quantity_foil": quantity_foil,
-                "usd": "",
-                "usd_foil": "",
-                "total_usd": "",
-                "total_usd_foil": "",
-                "storage_areas": "N/A",
-                "storage_quantity": quantity,
-                "deck_type": "",
-                "deck_quantity": "",
-                "deck_type_two": "",
-                "deck_quantity_two": "",
-                "deck_type_three": "",
-                "deck_quantity_three": "",
-                "deck_type_four": "",
-                "deck_quantity_four": ""
-            }
+            rewritten = DeckRewriter.rewrite_decks(zip_path, 'all_cards.json', precon_path, progress or UpdateProgress(), override)
+            print(f"Rewrote {rewritten} precon decks from {zip_path}")
+            remove(zip_path)
+            CatalogueHolder.reload("ADFFiles")
         except Exception as e:
-            return {}
\ No newline at end of file
+            return e
\ No newline at end of file
@@ -13,6 +13,6 @@ MENUSTYLE = QMN+"Bar {"+BGD+DARKGREY+WHITE+NBD+"}"+QMN+"Bar"+ITM+" {"+BGD+DARKGR
 BUTTONSTYLE = BGD+GREY+WHITE+NBD
 CTBUTTON = BGD+"color: transparent;"+NBD+"font-weight: bold;"
 TITLESTYLE = BGD+DARKGREY+WHITE
-THEMESTYLE = "QMainWindow {"+BGD+DG18+WHITE+"}"+"QTableWidget {"+BGD+VDGY+WHITE+"}"+"QHeaderView::section {"+BGD+DARKGREY+WHITE+"}"+"QWidget {"+BGD+DG18+WHITE+"}"+"QTabWidget::pane { border: 1px solid #555555; }"+"QTabBar::tab {"+BGD+VDGY+WHITE+"}"+"QPushButton {"+BGD+DARKGREY+WHITE+"}"
+THEMESTYLE = "QMainWindow {"+BGD+DG18+WHITE+"}"+"QTableView {"+BGD+VDGY+WHITE+"}"+"QHeaderView::section {"+BGD+DARKGREY+WHITE+"}"+"QWidget {"+BGD+DG18+WHITE+"}"+"QTabWidget::pane { border: 1px solid #555555; }"+"QTabBar::tab {"+BGD+VDGY+WHITE+"}"+"QPushButton {"+BGD+DARKGREY+WHITE+"}"
 WAITDARKTHEME = "QWidget {"+DG18+BGD+VDGY+"} QLabel {"+WHITE+"}"
 WAITTHEME = "QWidget {"+BLACK+BGD+WHITE+"} QLabel {"+BLACK+"}"
\ No newline at end of file
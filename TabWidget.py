@@ -1,8 +1,11 @@
 from PyQt5.QtWidgets import QTabWidget, QLabel, QHBoxLayout, QWidget, QPushButton, QTabBar
 from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import pyqtSignal
 from StyleSheet import CTBUTTON
 
 class TabWidget(QTabWidget):
+    tab_closing = pyqtSignal(QWidget)
+
     def __init__(self):
         super().__init__()
         self.tab_titles = {}
@@ -31,6 +34,7 @@ class TabWidget(QTabWidget):
     def close_tab(self, title):
         tab_index = self.tab_titles.get(title)
         if tab_index is not None and 0 <= tab_index < self.count():
+            self.tab_closing.emit(self.widget(tab_index))
             self.removeTab(tab_index)
             del self.tab_titles[title]
             for t in list(self.tab_titles.keys()):
@@ -0,0 +1,66 @@
+from logging import getLogger, FileHandler, Formatter, INFO
+from threading import Lock
+from time import perf_counter
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class UpdateProgress(QObject):
+    progress = pyqtSignal(str, str, 'qint64', 'qint64', str, 'qint64', float, float)
+    EMIT_INTERVAL = 0.2
+    LOG_INTERVAL = 5.0
+    LOG_FILE = "update.log"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.started = {}
+        self.last_emit = {}
+        self.last_log = {}
+        self.lock = Lock()
+        self.logger = getLogger("MTG-Cataloguer.update")
+        if not self.logger.handlers:
+            handler = FileHandler(self.LOG_FILE, encoding='utf-8')
+            handler.setFormatter(Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(INFO)
+
+    @staticmethod
+    def format_amount(amount, unit):
+        if unit != "B":
+            return f"{amount:,} {unit}"
+        for suffix in ("B", "KB", "MB", "GB"):
+            if amount < 1024 or suffix == "GB":
+                return f"{amount:.1f} {suffix}" if suffix != "B" else f"{amount} B"
+            amount /= 1024
+
+    def start(self, task, stage):
+        with self.lock:
+            now = perf_counter()
+            self.started[(task, stage)] = now
+            self.last_emit[(task, stage)] = 0.0
+            self.last_log[(task, stage)] = now
+        self.logger.info(f"{task} {stage} started")
+
+    def update(self, task, stage, done, total=0, unit="B", records=0, finished=False):
+        now = perf_counter()
+        with self.lock:
+            key = (task, stage)
+            started = self.started.setdefault(key, now)
+            if not finished and now - self.last_emit.get(key, 0.0) < self.EMIT_INTERVAL:
+                return
+            self.last_emit[key] = now
+            log_due = finished or now - self.last_log.get(key, started) >= self.LOG_INTERVAL
+            if log_due:
+                self.last_log[key] = now
+        elapsed = max(now - started, 1e-9)
+        rate = done / elapsed
+        eta = (total - done) / rate if total and rate else -1.0
+        self.progress.emit(task, stage, done, total, unit, records, rate, eta)
+        if log_due:
+            message = (f"{task} {stage} {'finished' if finished else 'progress'}: "
+                       f"{self.format_amount(done, unit)}"
+                       f"{' of ' + self.format_amount(total, unit) if total else ''}"
+                       f"{f', {records:,} records' if records else ''}"
+                       f" in {elapsed:.1f} s ({self.format_amount(int(rate), unit)}/s)")
+            self.logger.info(message)
+
+    def finish(self, task, stage, done, total=0, unit="B", records=0):
+        self.update(task, stage, done, total or done, unit, records, finished=True)
\ No newline at end of file
@@ -0,0 +1,47 @@
+from PyQt5.QtWidgets import QDialog, QFormLayout, QVBoxLayout, QLabel, QProgressBar
+from PyQt5.QtCore import Qt
+from UpdateProgress import UpdateProgress
+
+class UpdateProgressDialog(QDialog):
+    def __init__(self, progress, parent=None, title="Downloading Updates", message="Downloading updates, please wait..."):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setWindowModality(Qt.ApplicationModal)
+        self.setMinimumWidth(520)
+        self.rows = {}
+        self.form = QFormLayout()
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(message))
+        layout.addLayout(self.form)
+        self.setLayout(layout)
+        progress.progress.connect(self.update_task)
+
+    def task_row(self, task):
+        if task not in self.rows:
+            bar = QProgressBar(self)
+            bar.setRange(0, 1000)
+            bar.setTextVisible(False)
+            label = QLabel(self)
+            row = QVBoxLayout()
+            row.addWidget(bar)
+            row.addWidget(label)
+            self.form.addRow(f"{task}:", row)
+            self.rows[task] = (bar, label)
+        return self.rows[task]
+
+    def update_task(self, task, stage, done, total, unit, records, rate, eta):
+        bar, label = self.task_row(task)
+        if total:
+            bar.setRange(0, 1000)
+            bar.setValue(int(1000 * min(done / total, 1.0)))
+        else:
+            bar.setRange(0, 0)
+        amount = UpdateProgress.format_amount(done, unit)
+        if total:
+            amount += " / " + UpdateProgress.format_amount(total, unit)
+        details = [stage.capitalize(), amount, UpdateProgress.format_amount(int(rate), unit) + "/s"]
+        if records:
+            details.append(f"{records:,} records")
+        if eta >= 0:
+            details.append(f"ETA {int(eta // 60)}:{int(eta % 60):02d}")
+        label.setText(" · ".join(details))
\ No newline at end of file
@@ -0,0 +1,54 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+from PyQt5.QtCore import Qt, QTimer
+from sharedFunctions import format_cents
+
+class ValuationPanel(QWidget):
+    GROUPS = {"File": "files", "Set": "sets", "Color Identity": "colors", "Storage Area": "storage"}
+    HEADERS = ["Name", "Cards", "USD", "USD Foil", "Total"]
+    REFRESH_INTERVAL = 100
+
+    def __init__(self, valuation, parent=None):
+        super().__init__(parent)
+        self.valuation = valuation
+        layout = QVBoxLayout()
+        self.total_label = QLabel(self)
+        layout.addWidget(self.total_label)
+        self.group_box = QComboBox(self)
+        self.group_box.addItems(self.GROUPS.keys())
+        self.group_box.currentIndexChanged.connect(self.refresh)
+        layout.addWidget(self.group_box)
+        self.table = QTableWidget(0, len(self.HEADERS), self)
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.recalculate_button = QPushButton("Recalculate", self)
+        self.recalculate_button.clicked.connect(lambda: self.valuation.verify(True))
+        button_layout.addWidget(self.recalculate_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.valuation.changed.connect(self.refresh_timer.start)
+        self.valuation.verifying.connect(lambda busy: self.recalculate_button.setEnabled(not busy))
+        self.refresh()
+
+    def refresh(self):
+        summary = self.valuation.summary()
+        usd, usd_foil, cards = summary["total"]
+        self.total_label.setText(f"Collection Value: ${format_cents(usd + usd_foil)} ({cards:,} cards)")
+        rows = sorted(summary[self.GROUPS[self.group_box.currentText()]].items(), key=lambda item: (-(item[1][0] + item[1][1]), item[0]))
+        self.table.setRowCount(len(rows))
+        for row, (name, (usd, usd_foil, cards)) in enumerate(rows):
+            values = [name or "None", f"{cards:,}", format_cents(usd), format_cents(usd_foil), format_cents(usd + usd_foil)]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
\ No newline at end of file
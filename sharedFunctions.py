@@ -1,67 +1,108 @@
-from decimal import Decimal, InvalidOperation
+from bisect import bisect_right
+from functools import lru_cache
 from PyQt5.QtCore import Qt
-from re import findall, split, sub
+from re import compile
 
 def get_value(model, row, column_name, data_type=int):
-    for col in range(model.columnCount()):
-        if model.headerData(col, Qt.Horizontal) == column_name:
-            try:
-                return data_type(model.index(row, col).data(Qt.DisplayRole))
-            except (ValueError, TypeError):
-                return data_type(0)
+    col = model.schema.get(column_name)
+    if col is not None:
+        try:
+            return data_type(model.index(row, col).data(Qt.DisplayRole))
+        except (ValueError, TypeError):
+            return data_type(0)
     return data_type(0)
 
 def parse_date(date_str):
     year, month, day = map(int, date_str.split('-'))
     return year, month, day
 
+def pack_date(date_str):
+    year, month, day = parse_date(date_str)
+    return year * 10000 + month * 100 + day
+
+DIGITS = compile(r'\d+')
+
 def extract_collector_number(collector_number):
     if " // " in collector_number:
         collector_number = collector_number.split(" // ")[0]
-    numeric_part = int(''.join(findall(r'\d+', collector_number)))
-    return split(r'(\d+)', collector_number)[0], numeric_part
+    digits = DIGITS.findall(collector_number)
+    numeric_part = int(''.join(digits))
+    return collector_number[:collector_number.index(digits[0])], numeric_part
+
+SORT_FIELDS = ('release_date', 'set', 'collector_number')
+SORT_KEY_CACHE = 1 << 17
+
+@lru_cache(maxsize=SORT_KEY_CACHE)
+def cached_sort_key(release_date, set_code, collector_number):
+    return pack_date(release_date), set_code, extract_collector_number(collector_number)
+
+def sort_key(item):
+    return cached_sort_key(item['release_date'], item['set'], item['collector_number'])
+
+def insert_sorted(sorted_data, items):
+    for item in items:
+        sorted_data.insert(bisect_right(sorted_data, sort_key(item), key=sort_key), item)
+    return sorted_data
+
+def parse_cents(text):
+    if text is None:
+        return None
+    text = str(text).strip().lstrip('$').replace(',', '')
+    whole, _, fraction = text.partition('.')
+    if not (whole or fraction) or not (whole or '0').isdigit() or (fraction and not fraction.isdigit()):
+        return None
+    cents = int(whole or '0') * 100 + int((fraction + '00')[:2])
+    return cents + 1 if fraction[2:3] >= '5' else cents
+
+@lru_cache(maxsize=1024)
+def parse_quantity(value, minimum, default):
+    try:
+        return max(int(str(value).strip()), minimum)
+    except ValueError:
+        return default
+
+def catalogue_cents(value):
+    if value is None or isinstance(value, int):
+        return value
+    return parse_cents(value) if '.' in value else (int(value) if value.isdigit() else None)
+
+def format_cents(cents):
+    if cents is None:
+        return ""
+    sign = '-' if cents < 0 else ''
+    dollars, cents = divmod(abs(cents), 100)
+    return f"{sign}{dollars}.{cents:02d}"
+
+def price_item(item, all_card_data):
+    key = (item.get('lang'), item.get('set'), item.get('collector_number'))
+    card_data = all_card_data.get(key, {})
+    usd_value = catalogue_cents(card_data.get('usd'))
+    usd_foil_value = catalogue_cents(card_data.get('usd_foil'))
+    quantity = str(item.get('quantity', '1')).strip()
+    quantity_foil = str(item.get('quantity_foil', '0')).strip()
+
+    try:
+        quantity_int = max(int(quantity), 1)
+    except ValueError:
+        quantity_int = 1
+    try:
+        quantity_foil_int = max(int(quantity_foil), 0)
+    except ValueError:
+        quantity_foil_int = 0
+    
+    adjusted_quantity = quantity_int - quantity_foil_int
+
+    total_usd = adjusted_quantity * usd_value if usd_value is not None else 0
+    total_usd_foil = quantity_foil_int * usd_foil_value if usd_foil_value is not None else 0
+    item['total_usd'] = format_cents(total_usd) if total_usd else ""
+    item['total_usd_foil'] = format_cents(total_usd_foil) if total_usd_foil else ""
+    item['usd'] = format_cents(usd_value)
+    item['usd_foil'] = format_cents(usd_foil_value)
+    return item
 
 def sort_json_data(json_data, all_card_data=None):
     if all_card_data is not None:
         for item in json_data:
-            key = (item.get('lang'), item.get('set'), item.get('collector_number'))
-            card_data = all_card_data.get(key, {})
-            usd_value = card_data.get('usd', '') or ''
-            usd_foil_value = card_data.get('usd_foil', '') or ''
-            quantity = str(item.get('quantity', '1')).strip()
-            quantity_foil = str(item.get('quantity_foil', '0')).strip()
-
-            try:
-                quantity_int = max(int(quantity), 1)
-            except ValueError:
-                quantity_int = 1
-            try:
-                quantity_foil_int = max(int(quantity_foil), 0)
-            except ValueError:
-                quantity_foil_int = 0
-            
-            adjusted_quantity = quantity_int - quantity_foil_int
-
-            try:
-                usd_value = Decimal(sub(r'[^\d.]', '', usd_value or ''))
-                total_usd = str(adjusted_quantity * usd_value)
-            except (ValueError, InvalidOperation):
-                total_usd = ""
-            try:
-                usd_foil_value = Decimal(sub(r'[^\d.]', '', usd_foil_value or ''))
-                total_usd_foil = str(quantity_foil_int * usd_foil_value)
-            except (ValueError, InvalidOperation):
-                total_usd_foil = ""
-            item['total_usd'] = total_usd if total_usd != "0.00" else ""
-            item['total_usd_foil'] = total_usd_foil if total_usd_foil != "0.00" else ""
-            item['usd'] = str(usd_value)
-            item['usd_foil'] = str(usd_foil_value)
-    sorted_data = sorted(
-        json_data,
-        key=lambda x: (
-            parse_date(x['release_date']),
-            x['set'],
-            extract_collector_number(x['collector_number'])
-        )
-    )
+            price_item(item, all_card_data)
+    sorted_data = sorted(json_data, key=sort_key)
     return sorted_data
\ No newline at end of file